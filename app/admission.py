@@ -0,0 +1,149 @@
+"""
+Admission Control
+AIMD concurrency limit driven by time-to-first-byte, with per-route
+priorities; requests over the limit get an immediate 503 + Retry-After
+instead of queueing for a database connection
+"""
+
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from fastapi.responses import JSONResponse
+from prometheus_client import Counter, Gauge
+
+# Prometheus metrics
+ADMISSION_LIMIT = Gauge('admission_concurrency_limit', 'Current adaptive concurrency limit')
+ADMISSION_IN_FLIGHT = Gauge('admission_in_flight', 'Requests currently admitted')
+ADMISSION_SHED = Counter('admission_shed_total', 'Requests rejected with 503 by admission control', ['priority'])
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Set in the ASGI scope on shed requests so outer middleware can label them
+SHED_SCOPE_KEY = "admission.shed"
+
+
+class AdaptiveLimiter:
+    """Additive-increase / multiplicative-decrease concurrency limit.
+
+    A request whose time to first byte exceeds ``target_latency`` shrinks
+    the limit by ``backoff`` (at most once per ``target_latency``, so one
+    slow burst isn't counted many times). A fast response while the limit
+    is at least half used grows it by ``1 / limit``, i.e. about +1 per
+    limit's worth of requests. Reads may only fill ``read_share`` of the
+    limit, keeping headroom for writes; critical requests (health checks)
+    are counted but never refused. A release without a latency (routes
+    that are slow by design) frees the slot without moving the limit.
+    """
+
+    def __init__(
+        self,
+        initial_limit: float = 50,
+        min_limit: float = 5,
+        max_limit: float = 500,
+        target_latency: float = 0.25,
+        backoff: float = 0.9,
+        read_share: float = 0.8,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.read_share = read_share
+        self.in_flight = 0
+        self._clock = clock
+        self._last_decrease = float("-inf")
+        ADMISSION_LIMIT.set(self.limit)
+
+    def try_acquire(self, priority: str) -> bool:
+        if priority != "critical":
+            ceiling = self.limit if priority == "write" else self.limit * self.read_share
+            if self.in_flight >= ceiling:
+                ADMISSION_SHED.labels(priority=priority).inc()
+                return False
+        self.in_flight += 1
+        ADMISSION_IN_FLIGHT.set(self.in_flight)
+        return True
+
+    def release(self, priority: str, latency: Optional[float]) -> None:
+        self.in_flight -= 1
+        ADMISSION_IN_FLIGHT.set(self.in_flight)
+        if priority == "critical" or latency is None:
+            return
+
+        if latency > self.target_latency:
+            now = self._clock()
+            if now - self._last_decrease >= self.target_latency:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+        elif self.in_flight * 2 >= self.limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        ADMISSION_LIMIT.set(self.limit)
+
+    def report(self) -> Dict[str, Any]:
+        return {"limit": round(self.limit, 1), "in_flight": self.in_flight}
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying an AdaptiveLimiter per HTTP request.
+
+    Latency is measured to ``http.response.start`` so long streamed exports
+    don't read as overload. Paths under ``unmeasured_prefixes`` (naive
+    Fibonacci, bulk inserts) are slow at any load, so they're admitted and
+    counted but their latency never cuts the limit.
+    """
+
+    def __init__(
+        self,
+        app,
+        limiter: AdaptiveLimiter,
+        critical_paths: Iterable[str] = (),
+        unmeasured_prefixes: Iterable[str] = (),
+        retry_after_seconds: int = 1
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.critical_paths = frozenset(critical_paths)
+        self.unmeasured_prefixes = tuple(unmeasured_prefixes)
+        self.retry_after_seconds = retry_after_seconds
+
+    def classify(self, scope) -> str:
+        if scope["path"] in self.critical_paths:
+            return "critical"
+        return "read" if scope["method"] in READ_METHODS else "write"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        priority = self.classify(scope)
+        limiter = self.limiter
+        if not limiter.try_acquire(priority):
+            scope[SHED_SCOPE_KEY] = priority
+            response = JSONResponse(
+                {"detail": "Server is overloaded, retry shortly"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after_seconds)}
+            )
+            await response(scope, receive, send)
+            return
+
+        measured = not (self.unmeasured_prefixes and scope["path"].startswith(self.unmeasured_prefixes))
+        started = time.perf_counter()
+        first_byte = None
+
+        async def send_with_timing(message):
+            nonlocal first_byte
+            if first_byte is None and message["type"] == "http.response.start":
+                first_byte = time.perf_counter() - started
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            if not measured:
+                limiter.release(priority, None)
+            else:
+                limiter.release(priority, first_byte if first_byte is not None else time.perf_counter() - started)
@@ -0,0 +1,4 @@
+"""
+Offline benchmarks for the E-commerce API
+Run from the app directory, e.g. `python -m benchmarks.search_index`
+"""
@@ -0,0 +1,77 @@
+"""
+In-process app harness for benchmarks
+Drives the FastAPI app over ASGI (no sockets) against a local SQLite database
+"""
+
+import os
+import random
+import sys
+import tempfile
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def configure(database_path: Optional[str] = None, **env: str) -> str:
+    """Point the app at SQLite; must run before main is imported"""
+    if database_path is None:
+        database_path = os.path.join(tempfile.mkdtemp(prefix="ecommerce-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{database_path}"
+    os.environ.setdefault("DB_PASSWORD", "unused")
+    os.environ.setdefault("CACHE_BACKEND", "none")
+    for key, value in env.items():
+        os.environ[key] = value
+
+    # main.py resolves templates relative to the working directory
+    os.chdir(APP_DIR)
+    if APP_DIR not in sys.path:
+        sys.path.insert(0, APP_DIR)
+    return database_path
+
+
+async def seed(main, products: int = 1000, contacts: int = 1000, categories: int = 20, seed: int = 42) -> Dict[str, int]:
+    """Insert a deterministic catalog with multi-row inserts"""
+    from sqlalchemy import insert
+
+    rng = random.Random(seed)
+    base = datetime(2025, 1, 1)
+    async with main.AsyncSessionLocal() as session:
+        await session.execute(insert(main.Category).values([
+            {"name": f"Category {i}", "description": f"Seeded category {i}", "created_at": base}
+            for i in range(1, categories + 1)
+        ]))
+        for start in range(0, products, 1000):
+            await session.execute(insert(main.Product).values([
+                {
+                    "name": f"Product {i}",
+                    "description": f"Seeded product number {i}",
+                    "price": round(rng.uniform(1, 500), 2),
+                    "stock_quantity": rng.randint(0, 1000),
+                    "category_id": rng.randint(1, categories),
+                    "sku": f"SKU-{i:08d}",
+                    "is_active": True,
+                    "created_at": base + timedelta(seconds=i),
+                    "updated_at": base + timedelta(seconds=i),
+                }
+                for i in range(start + 1, min(products, start + 1000) + 1)
+            ]))
+        for start in range(0, contacts, 1000):
+            await session.execute(insert(main.Contact).values([
+                {"name": f"Contact {i}", "email": f"contact{i}@example.com", "phone": "+1-555-0100", "created_at": base}
+                for i in range(start + 1, min(contacts, start + 1000) + 1)
+            ]))
+        await session.commit()
+    return {"products": products, "contacts": contacts, "categories": categories}
+
+
+@asynccontextmanager
+async def running_app(main) -> AsyncIterator[httpx.AsyncClient]:
+    """Run the app's lifespan and yield an ASGI client bound to it"""
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
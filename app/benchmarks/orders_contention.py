@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Order Contention Benchmark
+Hammers POST /orders on a single hot SKU from many concurrent clients and
+reports orders/sec and latency; run it once with ORDER_BATCH_MAX=1 on the
+server and once with group commit enabled to compare
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+from latency import LatencyHistogram
+
+
+async def create_hot_product(client: httpx.AsyncClient, stock: int) -> int:
+    response = await client.post("/categories", json={"name": f"bench-{uuid.uuid4().hex[:8]}"})
+    response.raise_for_status()
+    response = await client.post("/products", json={
+        "name": "Hot SKU",
+        "price": 9.99,
+        "stock_quantity": stock,
+        "category_id": response.json()["id"],
+        "sku": f"HOT-{uuid.uuid4().hex[:8].upper()}"
+    })
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+async def place_orders(client: httpx.AsyncClient, product_id: int, deadline: float, histogram: LatencyHistogram, outcomes: dict):
+    payload = {"items": [{"product_id": product_id, "quantity": 1}]}
+    while time.perf_counter() < deadline:
+        start_time = time.perf_counter()
+        try:
+            response = await client.post("/orders", json=payload)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        histogram.record(time.perf_counter() - start_time)
+        outcomes[status] = outcomes.get(status, 0) + 1
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark order placement on a hot SKU")
+    parser.add_argument("--url", default="http://localhost:8080", help="Base URL of the API")
+    parser.add_argument("--concurrency", type=int, default=200, help="Concurrent order clients")
+    parser.add_argument("--duration", type=int, default=30, help="Test duration in seconds")
+    parser.add_argument("--stock", type=int, default=10_000_000, help="Initial stock of the hot SKU")
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=30.0, limits=limits) as client:
+        product_id = await create_hot_product(client, args.stock)
+        histogram = LatencyHistogram()
+        outcomes = {}
+
+        print(f"Placing orders on product {product_id} with {args.concurrency} clients for {args.duration}s...")
+        start_time = time.perf_counter()
+        deadline = start_time + args.duration
+        await asyncio.gather(*[
+            place_orders(client, product_id, deadline, histogram, outcomes)
+            for _ in range(args.concurrency)
+        ])
+        elapsed = time.perf_counter() - start_time
+
+        remaining = (await client.get(f"/products/{product_id}")).json()["stock_quantity"]
+
+    placed = outcomes.get(200, 0)
+    summary = histogram.summary()
+    print(f"Orders placed: {placed} ({placed / elapsed:.1f} orders/sec)")
+    print(f"Outcomes: {dict(sorted(outcomes.items()))}")
+    print(f"Latency p50 {summary['p50']*1000:.1f}ms | p99 {summary['p99']*1000:.1f}ms | max {summary['max']*1000:.1f}ms")
+    consistent = remaining == args.stock - placed
+    print(f"Stock check: {remaining} remaining, expected {args.stock - placed} ({'ok' if consistent else 'MISMATCH'})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Search Index Benchmark
+Builds the in-process product index over a synthetic catalog and reports
+build time, memory and query latency percentiles
+"""
+
+import argparse
+import gc
+import random
+import statistics
+import time
+
+import psutil
+
+from search import SearchIndex
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ro", "sa", "tu", "vi", "zen", "pro", "max", "ul", "tra", "on", "ix"]
+
+
+def make_vocabulary(size: int, rng: random.Random):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def make_catalog(count: int, vocabulary, rng: random.Random):
+    for product_id in range(1, count + 1):
+        name = " ".join(rng.choices(vocabulary, k=3))
+        description = " ".join(rng.choices(vocabulary, k=12))
+        yield product_id, name, description, f"SKU-{product_id:08d}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the product search index")
+    parser.add_argument("--products", type=int, default=1_000_000, help="Synthetic catalog size")
+    parser.add_argument("--vocabulary", type=int, default=20_000, help="Distinct words in the catalog")
+    parser.add_argument("--queries", type=int, default=500, help="Queries per query shape")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(args.vocabulary, rng)
+
+    process = psutil.Process()
+    baseline_rss = process.memory_info().rss
+    index = SearchIndex()
+    start_time = time.perf_counter()
+    batch = []
+    for row in make_catalog(args.products, vocabulary, rng):
+        batch.append(row)
+        if len(batch) == 5000:
+            index.add_many(batch)
+            batch = []
+    index.add_many(batch)
+    build_seconds = time.perf_counter() - start_time
+    memory_mb = (process.memory_info().rss - baseline_rss) / 1024**2
+    # Long-lived index objects should not be rescanned by every full collection
+    gc.collect()
+    gc.freeze()
+
+    print(f"Products: {index.documents:,}  Terms: {len(index._vocabulary):,}")
+    print(f"Build: {build_seconds:.1f}s ({index.documents / build_seconds:,.0f} products/s)  RSS growth: {memory_mb:,.0f} MB")
+
+    shapes = {
+        "single word": lambda: rng.choice(vocabulary),
+        "two words": lambda: " ".join(rng.choices(vocabulary, k=2)),
+        "prefix": lambda: rng.choice(vocabulary)[:3],
+        "sku": lambda: f"SKU-{rng.randint(1, args.products):08d}",
+    }
+    print("-" * 60)
+    for shape, make_query in shapes.items():
+        timings = []
+        for _ in range(args.queries):
+            query = make_query()
+            start_time = time.perf_counter()
+            index.search(query, limit=20)
+            timings.append(time.perf_counter() - start_time)
+        cuts = statistics.quantiles(timings, n=100)
+        print(f"{shape:12} | p50 {cuts[49]*1000:7.2f}ms | p99 {cuts[98]*1000:7.2f}ms | max {max(timings)*1000:7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
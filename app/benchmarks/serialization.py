@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Serialization Benchmark and Conformance Check
+Compares list endpoint output with FAST_SERIALIZATION off and on, failing on
+any difference, then reports requests/sec per core for both paths
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from benchmarks.asgi_app import configure, running_app, seed
+
+ENDPOINTS = [
+    "/products?limit=100",
+    "/products?limit=100&sort=price",
+    "/products?limit=50&category_id=3&min_price=10&max_price=400",
+    "/contacts?limit=100",
+    "/categories?limit=100",
+]
+
+
+async def measure(client, path: str, seconds: float) -> float:
+    requests = 0
+    deadline = time.perf_counter() + seconds
+    start_time = time.perf_counter()
+    while time.perf_counter() < deadline:
+        response = await client.get(path)
+        response.raise_for_status()
+        requests += 1
+    return requests / (time.perf_counter() - start_time)
+
+
+async def run(args) -> int:
+    configure(CACHE_BACKEND="none")
+    import main
+
+    async with running_app(main) as client:
+        await seed(main, products=args.products, contacts=args.products)
+
+        failures = 0
+        results = []
+        for path in ENDPOINTS:
+            main.settings.fast_serialization = False
+            reference = await client.get(path)
+            baseline_rps = await measure(client, path, args.seconds)
+
+            main.settings.fast_serialization = True
+            fast = await client.get(path)
+            fast_rps = await measure(client, path, args.seconds)
+
+            same = (
+                reference.json() == fast.json()
+                and reference.headers.get("x-next-cursor") == fast.headers.get("x-next-cursor")
+            )
+            failures += 0 if same else 1
+            results.append((path, same, baseline_rps, fast_rps))
+
+    print(f"{'endpoint':60} | conform | pydantic req/s | fast req/s | speedup")
+    print("-" * 110)
+    for path, same, baseline_rps, fast_rps in results:
+        print(f"{path:60} | {'ok' if same else 'DIFF':7} | {baseline_rps:14.1f} | {fast_rps:10.1f} | {fast_rps / baseline_rps:6.2f}x")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare default and fast JSON serialization for list endpoints")
+    parser.add_argument("--products", type=int, default=5000, help="Seeded products and contacts")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Measurement time per endpoint and mode")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
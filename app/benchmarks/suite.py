@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Endpoint Benchmark Suite
+Drives every route of the app in-process over ASGI against seeded SQLite
+catalogs of several sizes, stores the results as a JSON baseline, and
+compares runs so p50/p99 latency or allocation regressions fail the build
+
+  python -m benchmarks.suite run --sizes 1000,20000 --output baseline.json
+  python -m benchmarks.suite run --output current.json --baseline baseline.json
+  python -m benchmarks.suite compare baseline.json current.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.asgi_app import configure, running_app, seed
+
+# Requests per scenario used for the allocation pass (run under tracemalloc)
+ALLOCATION_SAMPLES = 20
+
+
+class Scenario:
+    """One benchmarked request; ``path`` and ``body`` are called with the iteration number"""
+
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        path: Callable[[int], str],
+        body: Optional[Callable[[int], Any]] = None,
+        iterations: Optional[int] = None,
+        expect: tuple = ("200",)
+    ):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.iterations = iterations
+        self.expect = expect
+
+    async def request(self, client, i: int) -> str:
+        """Send one request and return its status; app exceptions are reported, not raised"""
+        try:
+            if self.body is None:
+                response = await client.request(self.method, self.path(i))
+            else:
+                response = await client.request(self.method, self.path(i), json=self.body(i))
+        except Exception as e:
+            return type(e).__name__
+        return str(response.status_code)
+
+
+def scenarios(size: int, seed_value: int = 7) -> List[Scenario]:
+    """Every route, reads first so writes don't change what they measure"""
+    rng = random.Random(seed_value)
+    ids = [rng.randint(1, size) for _ in range(1024)]
+
+    def some_id(i: int) -> int:
+        return ids[i % len(ids)]
+
+    def product(i: int) -> Dict[str, Any]:
+        return {
+            "name": f"Bench product {size}-{i}", "description": "Created by the benchmark suite",
+            "price": 9.99, "stock_quantity": 100, "category_id": 1 + i % 20, "sku": f"BENCH-{size}-{i:07d}"
+        }
+
+    def contact(i: int, prefix: str = "one") -> Dict[str, Any]:
+        return {"name": f"Bench contact {i}", "email": f"bench-{prefix}-{size}-{i}@example.com", "phone": "+1-555-0199"}
+
+    return [
+        # Health and ops
+        Scenario("health", "GET", lambda i: "/health"),
+        Scenario("health_simple", "GET", lambda i: "/health/simple"),
+        Scenario("metrics", "GET", lambda i: "/metrics"),
+        # Pages
+        Scenario("root", "GET", lambda i: "/"),
+        Scenario("web", "GET", lambda i: "/web"),
+        Scenario("jinja", "GET", lambda i: "/jinja"),
+        # Catalog reads
+        Scenario("products_page", "GET", lambda i: "/products?limit=100"),
+        Scenario("products_by_price", "GET", lambda i: "/products?limit=100&sort=price"),
+        Scenario("products_filtered", "GET", lambda i: f"/products?limit=50&category_id={1 + i % 20}&min_price=10&max_price=400"),
+        Scenario("products_deep_offset", "GET", lambda i: f"/products?limit=100&skip={size // 2}"),
+        Scenario("product_detail", "GET", lambda i: f"/products/{some_id(i)}"),
+        Scenario("product_search", "GET", lambda i: f"/products/search?q=product+{some_id(i)}&limit=20"),
+        Scenario("product_search_prefix", "GET", lambda i: "/products/search?q=seed&limit=20"),
+        Scenario("categories_page", "GET", lambda i: "/categories?limit=100"),
+        Scenario("contacts_page", "GET", lambda i: "/contacts?limit=100"),
+        Scenario("contact_detail", "GET", lambda i: f"/contacts/{some_id(i)}"),
+        Scenario("export_products", "GET", lambda i: "/export/products?format=ndjson", iterations=5),
+        Scenario("export_contacts", "GET", lambda i: "/export/contacts?format=csv", iterations=5),
+        # CPU
+        Scenario("fibonacci_iterative", "GET", lambda i: "/compute/fibonacci/500"),
+        # Writes
+        Scenario("create_category", "POST", lambda i: "/categories", lambda i: {"name": f"Bench category {size}-{i}"}),
+        Scenario("create_product", "POST", lambda i: "/products", product),
+        Scenario("create_contact", "POST", lambda i: "/contacts", contact),
+        Scenario(
+            "bulk_contacts_100", "POST", lambda i: "/contacts/bulk",
+            lambda i: [contact(i * 100 + j, "bulk") for j in range(100)], iterations=20
+        ),
+        Scenario(
+            "bulk_products_100", "POST", lambda i: "/products/bulk",
+            lambda i: [product(1_000_000 + i * 100 + j) for j in range(100)], iterations=20
+        ),
+        Scenario(
+            "create_order", "POST", lambda i: "/orders",
+            lambda i: {"items": [{"product_id": some_id(i), "quantity": 1}, {"product_id": some_id(i + 1), "quantity": 2}]}
+        ),
+        Scenario("export_orders", "GET", lambda i: "/export/orders?format=ndjson", iterations=5),
+    ]
+
+
+async def timed_round(client, scenario: Scenario, count: int, offset: int, unexpected: Dict[str, int]) -> Dict[str, float]:
+    from latency import LatencyHistogram
+
+    histogram = LatencyHistogram()
+    start_time = time.perf_counter()
+    for i in range(count):
+        request_start = time.perf_counter()
+        status = await scenario.request(client, offset + i)
+        histogram.record(time.perf_counter() - request_start)
+        if status not in scenario.expect:
+            unexpected[status] = unexpected.get(status, 0) + 1
+    summary = histogram.summary()
+    summary["requests_per_second"] = count / (time.perf_counter() - start_time)
+    return summary
+
+
+async def measure(client, scenario: Scenario, iterations: int, rounds: int, offset: int) -> Dict[str, Any]:
+    unexpected: Dict[str, int] = {}
+    count = scenario.iterations or iterations
+
+    # Warm up caches, pools and lazy imports before timing
+    for i in range(max(1, count // 20)):
+        await scenario.request(client, offset + i)
+    offset += max(1, count // 20)
+
+    # Each statistic is the median over rounds, so one noisy round can't fail a comparison
+    summaries = []
+    for _ in range(rounds):
+        summaries.append(await timed_round(client, scenario, count, offset, unexpected))
+        offset += count
+
+    # Allocation pass: peak traced memory per request above what was live before it
+    samples = []
+    tracemalloc.start()
+    try:
+        for i in range(min(ALLOCATION_SAMPLES, count)):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await scenario.request(client, offset + i)
+            samples.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+    samples.sort()
+
+    def median(key: str) -> float:
+        return statistics.median(summary[key] for summary in summaries)
+
+    return {
+        "requests": count * rounds,
+        "p50_ms": round(median("p50") * 1000, 3),
+        "p90_ms": round(median("p90") * 1000, 3),
+        "p99_ms": round(median("p99") * 1000, 3),
+        "mean_ms": round(median("avg") * 1000, 3),
+        "requests_per_second": round(median("requests_per_second"), 1),
+        "alloc_peak_kb": round(samples[len(samples) // 2] / 1024, 1) if samples else 0.0,
+        "unexpected_status": unexpected,
+    }
+
+
+async def run_size(main, size: int, iterations: int, rounds: int, only: Optional[str]) -> Dict[str, Dict[str, Any]]:
+    from sqlalchemy import update
+
+    from search import SearchIndex
+
+    main.settings.database_url = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(prefix='ecommerce-suite-'), 'bench.db')}"
+    async with running_app(main):
+        await seed(main, products=size, contacts=size)
+        # Enough stock that create_order never runs out
+        async with main.AsyncSessionLocal() as session:
+            await session.execute(update(main.Product).values(stock_quantity=10**7))
+            await session.commit()
+
+    # Second start: the search index and caches build from the seeded tables
+    main.search_index = SearchIndex()
+    results = {}
+    async with running_app(main) as client:
+        while not main.search_index.ready:
+            await asyncio.sleep(0.05)
+        # Keep the seeded catalog and module state out of cyclic GC scans between scenarios
+        gc.collect()
+        gc.freeze()
+        offset = 0
+        for scenario in scenarios(size):
+            if only and only not in scenario.name:
+                continue
+            results[scenario.name] = await measure(client, scenario, iterations, rounds, offset)
+            offset += 10 * ((scenario.iterations or iterations) * rounds + ALLOCATION_SAMPLES)
+            print(
+                f"  [{size:>7}] {scenario.name:24} p50 {results[scenario.name]['p50_ms']:8.3f}ms"
+                f"  p99 {results[scenario.name]['p99_ms']:8.3f}ms  alloc {results[scenario.name]['alloc_peak_kb']:8.1f}KB",
+                file=sys.stderr
+            )
+        gc.unfreeze()
+    return results
+
+
+async def run(args) -> Dict[str, Any]:
+    configure(CACHE_BACKEND=args.cache)
+    import main
+
+    # Keep app logs out of the report
+    main.log_sink.stream = open(os.devnull, "wb")
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = {}
+    for size in sizes:
+        for name, result in (await run_size(main, size, args.iterations, args.rounds, args.only)).items():
+            results[f"{name}@{size}"] = result
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "iterations": args.iterations,
+            "rounds": args.rounds,
+            "cache_backend": args.cache,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], args) -> int:
+    """Print a comparison table; returns the number of regressions"""
+    limits = {"p50_ms": args.p50, "p99_ms": args.p99, "alloc_peak_kb": args.alloc}
+    regressions = 0
+    print(f"{'scenario':36} | {'p50 ms':>18} | {'p99 ms':>18} | {'alloc KB':>18} | verdict")
+    print("-" * 115)
+    for key, result in current["results"].items():
+        reference = baseline["results"].get(key)
+        if reference is None:
+            print(f"{key:36} | {'(new)':>18} | {'':>18} | {'':>18} | -")
+            continue
+
+        cells, failed = [], []
+        for metric, limit in limits.items():
+            before, after = reference[metric], result[metric]
+            change = (after - before) / before if before else 0.0
+            cells.append(f"{before:7.2f} -> {after:7.2f}")
+            # Tiny absolute differences are noise, whatever the ratio
+            floor = args.min_delta_ms if metric.endswith("_ms") else args.min_delta_kb
+            if change > limit and after - before > floor:
+                failed.append(f"{metric} +{change:.0%}")
+        if result["unexpected_status"]:
+            failed.append(f"status {result['unexpected_status']}")
+
+        regressions += 1 if failed else 0
+        print(f"{key:36} | {' | '.join(cells)} | {'REGRESSED ' + ', '.join(failed) if failed else 'ok'}")
+
+    missing = sorted(set(baseline["results"]) - set(current["results"]))
+    if missing:
+        print(f"Not measured in this run: {', '.join(missing)}")
+    print(f"\n{regressions} regression(s)")
+    return regressions
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="In-process endpoint benchmarks with baseline comparison")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    thresholds = argparse.ArgumentParser(add_help=False)
+    thresholds.add_argument("--p50", type=float, default=0.20, help="Allowed relative p50 increase")
+    thresholds.add_argument("--p99", type=float, default=0.35, help="Allowed relative p99 increase")
+    thresholds.add_argument("--alloc", type=float, default=0.15, help="Allowed relative allocation increase")
+    thresholds.add_argument("--min-delta-ms", type=float, default=0.25, help="Ignore latency changes smaller than this")
+    thresholds.add_argument("--min-delta-kb", type=float, default=8.0, help="Ignore allocation changes smaller than this")
+
+    run_parser = commands.add_parser("run", parents=[thresholds], help="Run the suite")
+    run_parser.add_argument("--sizes", default="1000,20000", help="Comma-separated catalog sizes (products and contacts)")
+    run_parser.add_argument("--iterations", type=int, default=200, help="Timed requests per scenario and round")
+    run_parser.add_argument("--rounds", type=int, default=3, help="Timed rounds per scenario; statistics are medians over rounds")
+    run_parser.add_argument("--cache", default="none", choices=["none", "memory"], help="Catalog cache backend")
+    run_parser.add_argument("--only", help="Run scenarios whose name contains this")
+    run_parser.add_argument("--output", help="Write results JSON here")
+    run_parser.add_argument("--baseline", help="Compare against this results JSON and fail on regressions")
+
+    compare_parser = commands.add_parser("compare", parents=[thresholds], help="Compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.command == "compare":
+        sys.exit(1 if compare(load(args.baseline), load(args.current), args) else 0)
+
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+
+    failed = [key for key, result in report["results"].items() if result["unexpected_status"]]
+    for key in failed:
+        print(f"{key}: unexpected status codes {report['results'][key]['unexpected_status']}", file=sys.stderr)
+    if args.baseline and compare(load(args.baseline), report, args):
+        sys.exit(1)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
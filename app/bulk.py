@@ -0,0 +1,118 @@
+"""
+Bulk Ingestion
+Parses JSON array / NDJSON bodies, validates rows and inserts them with
+chunked multi-row INSERT statements, reporting per-row conflicts
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Tuple, Type
+
+import structlog
+from fastapi import HTTPException
+from prometheus_client import Counter
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = structlog.get_logger()
+
+# Prometheus metrics
+BULK_ROWS = Counter('bulk_rows_total', 'Rows processed by bulk ingestion', ['entity', 'outcome'])
+
+
+def parse_records(body: bytes, content_type: str, max_rows: int) -> List[Any]:
+    """Decode a JSON array or newline-delimited JSON request body"""
+    try:
+        if "ndjson" in content_type or "jsonlines" in content_type:
+            records = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            records = json.loads(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Malformed body: {e}")
+
+    if not isinstance(records, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array or NDJSON body")
+    if len(records) > max_rows:
+        raise HTTPException(status_code=413, detail=f"At most {max_rows} rows per request")
+    return records
+
+
+def validate_records(records: List[Any], schema: Type[BaseModel]) -> Tuple[List[Tuple[int, BaseModel]], List[Dict[str, Any]]]:
+    """Validate each record, returning (index, model) pairs and per-row errors"""
+    valid, invalid = [], []
+    for index, record in enumerate(records):
+        try:
+            valid.append((index, schema.model_validate(record)))
+        except ValidationError as e:
+            invalid.append({"index": index, "errors": e.errors(include_url=False, include_context=False)})
+    return valid, invalid
+
+
+class BulkInserter:
+    """Inserts validated rows for one model, skipping duplicates of a unique column.
+
+    Duplicates within the request and rows already in the table are reported
+    as conflicts up front; each remaining chunk goes in as one multi-row
+    INSERT. If a concurrent writer still trips the unique index, that chunk
+    falls back to row-by-row inserts inside savepoints so only the offending
+    rows are rejected.
+    """
+
+    def __init__(self, model, unique_field: str, chunk_size: int = 500):
+        self.model = model
+        self.unique_field = unique_field
+        self.chunk_size = max(1, chunk_size)
+
+    def _row(self, item: BaseModel, now: datetime) -> Dict[str, Any]:
+        row = item.model_dump()
+        for column in ("created_at", "updated_at"):
+            if hasattr(self.model, column):
+                row[column] = now
+        return row
+
+    async def run(self, db: AsyncSession, items: List[Tuple[int, BaseModel]]) -> Tuple[List[Any], List[Dict[str, Any]]]:
+        """Insert items, returning the unique keys inserted and per-row conflicts"""
+        entity = self.model.__tablename__
+        column = getattr(self.model, self.unique_field)
+        inserted, conflicts = [], []
+        seen = set()
+
+        for start in range(0, len(items), self.chunk_size):
+            chunk = items[start:start + self.chunk_size]
+            keys = {getattr(item, self.unique_field) for _, item in chunk}
+            result = await db.execute(select(column).where(column.in_(keys)))
+            existing = set(result.scalars().all())
+
+            now = datetime.utcnow()
+            pending = []
+            for index, item in chunk:
+                key = getattr(item, self.unique_field)
+                if key in existing or key in seen:
+                    conflicts.append({"index": index, self.unique_field: key, "error": "duplicate"})
+                    continue
+                seen.add(key)
+                pending.append((index, self._row(item, now)))
+
+            if not pending:
+                continue
+
+            try:
+                async with db.begin_nested():
+                    await db.execute(insert(self.model).values([row for _, row in pending]))
+                inserted.extend(row[self.unique_field] for _, row in pending)
+            except IntegrityError:
+                logger.warning("Bulk chunk conflicted, retrying row by row", entity=entity, rows=len(pending))
+                for index, row in pending:
+                    try:
+                        async with db.begin_nested():
+                            await db.execute(insert(self.model).values(row))
+                        inserted.append(row[self.unique_field])
+                    except IntegrityError as e:
+                        conflicts.append({"index": index, self.unique_field: row[self.unique_field], "error": str(e.orig)})
+
+        await db.commit()
+        BULK_ROWS.labels(entity=entity, outcome="inserted").inc(len(inserted))
+        BULK_ROWS.labels(entity=entity, outcome="conflict").inc(len(conflicts))
+        return inserted, conflicts
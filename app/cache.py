@@ -0,0 +1,244 @@
+"""
+Catalog Cache Layer
+Read-through cache with TTL and LRU eviction, backed in-process or by Redis
+"""
+
+import json
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+import structlog
+from prometheus_client import Counter
+
+logger = structlog.get_logger()
+
+# Prometheus metrics
+CACHE_HITS = Counter('cache_hits_total', 'Cache hits', ['namespace'])
+CACHE_MISSES = Counter('cache_misses_total', 'Cache misses', ['namespace'])
+CACHE_EVICTIONS = Counter('cache_evictions_total', 'Cache evictions', ['reason'])
+
+# Per-namespace entry recording when it was last invalidated (see ReadThroughCache)
+INVALIDATED_AT_KEY = "__invalidated_at__"
+
+
+def _json_default(value: Any) -> Any:
+    # Column-projected rows (FAST_SERIALIZATION) carry raw datetimes
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class CacheBackend:
+    """Storage interface for cached values, grouped by namespace"""
+
+    async def get(self, namespace: str, key: Hashable) -> Optional[Any]:
+        return None
+
+    async def set(self, namespace: str, key: Hashable, value: Any) -> None:
+        pass
+
+    async def delete(self, namespace: str, key: Hashable) -> None:
+        pass
+
+    async def invalidate(self, namespace: str) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class NullCache(CacheBackend):
+    """Backend that never stores anything (CACHE_BACKEND=none)"""
+
+
+class MemoryCache(CacheBackend):
+    """In-process backend with per-entry TTL and size-bounded LRU eviction"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, namespace: str, key: Hashable) -> Optional[Any]:
+        entry_key = (namespace, key)
+        entry = self._entries.get(entry_key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[entry_key]
+            CACHE_EVICTIONS.labels(reason="expired").inc()
+            return None
+
+        self._entries.move_to_end(entry_key)
+        return value
+
+    async def set(self, namespace: str, key: Hashable, value: Any) -> None:
+        entry_key = (namespace, key)
+        self._entries[entry_key] = (self._clock() + self.ttl_seconds, value)
+        self._entries.move_to_end(entry_key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            CACHE_EVICTIONS.labels(reason="lru").inc()
+
+    async def delete(self, namespace: str, key: Hashable) -> None:
+        self._entries.pop((namespace, key), None)
+
+    async def invalidate(self, namespace: str) -> None:
+        stale = [entry_key for entry_key in self._entries if entry_key[0] == namespace]
+        for entry_key in stale:
+            del self._entries[entry_key]
+
+
+class RedisCache(CacheBackend):
+    """Redis-protocol backend; values are stored as JSON with a server-side TTL.
+
+    Any client exposing the ``redis.asyncio`` API (get/set/scan_iter/delete)
+    can be passed in, which lets tests run against a local fake.
+    """
+
+    def __init__(self, client, ttl_seconds: float = 30.0, prefix: str = "catalog:"):
+        self._client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisCache":
+        import redis.asyncio as redis
+
+        return cls(redis.from_url(url), **kwargs)
+
+    def _key(self, namespace: str, key: Hashable) -> str:
+        if isinstance(key, tuple):
+            key = "|".join("" if part is None else str(part) for part in key)
+        return f"{self.prefix}{namespace}:{key}"
+
+    async def get(self, namespace: str, key: Hashable) -> Optional[Any]:
+        raw = await self._client.get(self._key(namespace, key))
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    async def set(self, namespace: str, key: Hashable, value: Any) -> None:
+        await self._client.set(
+            self._key(namespace, key),
+            json.dumps(value, separators=(",", ":"), default=_json_default),
+            ex=max(1, int(self.ttl_seconds)),
+        )
+
+    async def delete(self, namespace: str, key: Hashable) -> None:
+        await self._client.delete(self._key(namespace, key))
+
+    async def invalidate(self, namespace: str) -> None:
+        keys = [key async for key in self._client.scan_iter(match=f"{self.prefix}{namespace}:*")]
+        if keys:
+            await self._client.delete(*keys)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class ReadThroughCache:
+    """Wraps a backend with read-through loading, metrics and invalidation.
+
+    Each namespace carries a local generation number. A value loaded while an
+    invalidation happened is returned to its caller but not stored, so a slow
+    read can never repopulate the cache with rows from before a commit.
+
+    Replicas lag the primary, so for ``replica_quiet_seconds`` after an
+    invalidation, values loaded from a replica aren't stored either. The
+    invalidation time is kept in the backend itself, so with Redis the rule
+    holds across workers.
+    """
+
+    def __init__(self, backend: CacheBackend, replica_quiet_seconds: float = 0.0):
+        self.backend = backend
+        self.replica_quiet_seconds = replica_quiet_seconds
+        self._generations: Dict[str, int] = {}
+
+    async def _mark_invalidated(self, namespace: str) -> None:
+        if self.replica_quiet_seconds > 0:
+            await self.backend.set(namespace, INVALIDATED_AT_KEY, time.time())
+
+    async def _recently_invalidated(self, namespace: str) -> bool:
+        invalidated_at = await self.backend.get(namespace, INVALIDATED_AT_KEY)
+        return invalidated_at is not None and time.time() - invalidated_at < self.replica_quiet_seconds
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        from_replica: bool = False
+    ) -> Any:
+        try:
+            value = await self.backend.get(namespace, key)
+        except Exception as e:
+            logger.warning("Cache read failed", namespace=namespace, error=str(e))
+            value = None
+
+        if value is not None:
+            CACHE_HITS.labels(namespace=namespace).inc()
+            return value
+
+        CACHE_MISSES.labels(namespace=namespace).inc()
+        generation = self._generations.get(namespace, 0)
+        value = await loader()
+
+        if value is not None and self._generations.get(namespace, 0) == generation:
+            try:
+                if from_replica and self.replica_quiet_seconds > 0 and await self._recently_invalidated(namespace):
+                    return value
+                await self.backend.set(namespace, key, value)
+            except Exception as e:
+                logger.warning("Cache write failed", namespace=namespace, error=str(e))
+        return value
+
+    async def invalidate(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            try:
+                await self.backend.invalidate(namespace)
+                await self._mark_invalidated(namespace)
+            except Exception as e:
+                logger.warning("Cache invalidation failed", namespace=namespace, error=str(e))
+
+    async def delete(self, namespace: str, *keys: Hashable) -> None:
+        """Drop individual entries, e.g. products whose stock just changed"""
+        # Bumping the generation also stops in-flight loads of this namespace from storing stale rows
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        for key in keys:
+            try:
+                await self.backend.delete(namespace, key)
+            except Exception as e:
+                logger.warning("Cache delete failed", namespace=namespace, error=str(e))
+        try:
+            await self._mark_invalidated(namespace)
+        except Exception as e:
+            logger.warning("Cache delete failed", namespace=namespace, error=str(e))
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+def build_cache(
+    backend: str,
+    max_entries: int,
+    ttl_seconds: float,
+    redis_url: Optional[str] = None,
+    replica_quiet_seconds: float = 0.0
+) -> ReadThroughCache:
+    """Create the configured cache (memory, redis or none)"""
+    if backend == "redis" and redis_url:
+        return ReadThroughCache(RedisCache.from_url(redis_url, ttl_seconds=ttl_seconds), replica_quiet_seconds)
+    if backend == "none":
+        return ReadThroughCache(NullCache())
+    return ReadThroughCache(MemoryCache(max_entries=max_entries, ttl_seconds=ttl_seconds), replica_quiet_seconds)
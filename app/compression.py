@@ -0,0 +1,252 @@
+"""
+Response Compression
+Content-negotiated zstd / brotli / gzip as a pure ASGI middleware: buffered
+bodies over a size threshold, streamed bodies chunk by chunk, and compressed
+copies of ETagged bodies reused instead of recompressed
+"""
+
+import gzip
+import hashlib
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+
+from prometheus_client import Counter
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is in requirements.txt
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is in requirements.txt
+    zstandard = None
+
+# Prometheus metrics
+COMPRESSED_RESPONSES = Counter('compressed_responses_total', 'Responses compressed by the middleware', ['encoding', 'mode'])
+COMPRESSION_BYTES = Counter('compression_bytes_total', 'Body bytes before and after compression', ['encoding', 'stage'])
+
+# Server preference when the client rates several encodings equally
+DEFAULT_ENCODINGS = ("zstd", "br", "gzip")
+
+# (per-response, precompressed/static) levels
+LEVELS = {
+    "zstd": (3, 19),
+    "br": (4, 11),
+    "gzip": (5, 9),
+}
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def available_encodings(names: Sequence[str] = DEFAULT_ENCODINGS) -> Tuple[str, ...]:
+    """Drop encodings whose optional library isn't installed"""
+    missing = {"br": brotli is None, "zstd": zstandard is None}
+    return tuple(name for name in names if name in LEVELS and not missing.get(name, False))
+
+
+def negotiate(accept_encoding: str, encodings: Sequence[str]) -> str:
+    """Best encoding for an Accept-Encoding header: highest q, then server order"""
+    if not accept_encoding:
+        return "identity"
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+
+    best, best_quality = "identity", 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, best: bool = False) -> bytes:
+    """One-shot compression; ``best`` is for bodies compressed once and reused"""
+    level = LEVELS[encoding][1 if best else 0]
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class StreamCompressor:
+    """Incremental compressor that flushes after every chunk so clients see rows as they arrive"""
+
+    def __init__(self, encoding: str):
+        level = LEVELS[encoding][0]
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        elif encoding == "br":
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = gzip container
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "zstd":
+            return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by (ETag, encoding, body digest).
+
+    Handler ETags describe the query and catalog version rather than the
+    bytes (a list page and its fast-serialization twin share one), so the
+    key also carries a digest of the uncompressed body. Hashing is far
+    cheaper than compressing, and a hit is then always the right bytes.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, bytes], bytes]" = OrderedDict()
+
+    @staticmethod
+    def key(etag: str, encoding: str, body: bytes) -> Tuple[str, str, bytes]:
+        return etag, encoding, hashlib.blake2b(body, digest_size=16).digest()
+
+    def get(self, key: Tuple[str, str, bytes]) -> Optional[bytes]:
+        compressed = self._entries.get(key)
+        if compressed is not None:
+            self._entries.move_to_end(key)
+        return compressed
+
+    def set(self, key: Tuple[str, str, bytes], compressed: bytes) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = compressed
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class CompressionMiddleware:
+    """ASGI middleware negotiating zstd/br/gzip per request.
+
+    Responses that already carry a Content-Encoding (pre-compressed pages),
+    non-text media types, and single-message bodies under ``minimum_size``
+    pass through untouched. Streaming bodies are always compressed. A
+    compressed response's strong ETag is sent weak, so If-None-Match still
+    matches the handler's ETag while caches know the bytes differ.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, encodings: Sequence[str] = DEFAULT_ENCODINGS, cache_entries: int = 256):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings(encodings)
+        self.cache = CompressedBodyCache(cache_entries)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding == "identity":
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(self, encoding, send))
+
+
+class _CompressingSend:
+    """The ``send`` callable for one response; decides on the first body message"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message = None
+        self.passthrough = False
+        self.stream: Optional[StreamCompressor] = None
+
+    def _compressible(self, headers: MutableHeaders) -> bool:
+        if self.start_message["status"] in (204, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def _mark_encoded(self, headers: MutableHeaders) -> None:
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
+
+    async def __call__(self, message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            return
+        if message_type != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        if self.stream is not None:
+            body = self.stream.chunk(message.get("body", b""))
+            if not message.get("more_body", False):
+                body += self.stream.finish()
+            COMPRESSION_BYTES.labels(encoding=self.encoding, stage="in").inc(len(message.get("body", b"")))
+            COMPRESSION_BYTES.labels(encoding=self.encoding, stage="out").inc(len(body))
+            await self.send({"type": "http.response.body", "body": body, "more_body": message.get("more_body", False)})
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        if not self._compressible(headers) or (not more_body and len(body) < self.middleware.minimum_size):
+            self.passthrough = True
+            await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        if more_body:
+            self.stream = StreamCompressor(self.encoding)
+            del headers["Content-Length"]
+            self._mark_encoded(headers)
+            await self.send(self.start_message)
+            COMPRESSED_RESPONSES.labels(encoding=self.encoding, mode="streaming").inc()
+            await self(message)
+            return
+
+        etag = headers.get("etag")
+        cache_key = CompressedBodyCache.key(etag, self.encoding, body) if etag and not etag.startswith("W/") else None
+        compressed = self.middleware.cache.get(cache_key) if cache_key else None
+        if compressed is None:
+            compressed = compress(body, self.encoding)
+            if cache_key:
+                self.middleware.cache.set(cache_key, compressed)
+            COMPRESSED_RESPONSES.labels(encoding=self.encoding, mode="buffered").inc()
+        else:
+            COMPRESSED_RESPONSES.labels(encoding=self.encoding, mode="cached").inc()
+        COMPRESSION_BYTES.labels(encoding=self.encoding, stage="in").inc(len(body))
+        COMPRESSION_BYTES.labels(encoding=self.encoding, stage="out").inc(len(compressed))
+
+        headers["Content-Length"] = str(len(compressed))
+        self._mark_encoded(headers)
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": compressed, "more_body": False})
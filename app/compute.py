@@ -0,0 +1,30 @@
+"""
+CPU-bound Workloads
+Pure functions dispatched to the process pool; kept free of app imports so
+spawned workers start quickly
+"""
+
+import time
+from typing import Any, Callable, Tuple
+
+
+def fib_naive(n: int) -> int:
+    """Exponential recursive Fibonacci, kept as an explicit stress workload"""
+    if n <= 1:
+        return n
+    return fib_naive(n - 1) + fib_naive(n - 2)
+
+
+def fib_iterative(n: int) -> int:
+    """O(n) Fibonacci"""
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+
+def timed_call(func: Callable[..., Any], *args) -> Tuple[Any, float]:
+    """Run func in the worker and report its run time without queue wait"""
+    start_time = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start_time
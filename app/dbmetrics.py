@@ -0,0 +1,166 @@
+"""
+Statement Instrumentation
+SQLAlchemy engine hooks timing every statement by normalized fingerprint,
+counting rows, logging slow queries with parameter shapes, and a pool class
+that measures how long checkouts wait for a connection
+"""
+
+import hashlib
+import re
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+import structlog
+from prometheus_client import Counter, Histogram
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = structlog.get_logger()
+
+# Prometheus metrics
+DB_STATEMENT_DURATION = Histogram(
+    'db_statement_duration_seconds',
+    'Statement execution time by normalized fingerprint',
+    ['pool', 'statement'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+DB_STATEMENT_ROWS = Counter('db_statement_rows_total', 'Rows returned or affected by fingerprint', ['pool', 'statement'])
+DB_STATEMENT_ERRORS = Counter('db_statement_errors_total', 'Statements that raised, by fingerprint', ['pool', 'statement'])
+
+# Set on the connection record by TimedQueuePool, read by the pool's checkout listener
+ACQUIRE_WAIT_KEY = "acquire_wait_seconds"
+
+_COMMENTS = re.compile(r"/\*.*?\*/|--[^\n]*", re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDERS = re.compile(r"%\(\w+\)s|%s|\?|(?<![:\w]):\w+|\b\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_REPEATED_LISTS = re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+")
+_WHITESPACE = re.compile(r"\s+")
+_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|TABLE)\s+[`\"]?(\w+)", re.I)
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> Tuple[str, str]:
+    """(label, normalized SQL) for a statement.
+
+    Literals and placeholders become ``?`` and IN lists / multi-row VALUES
+    collapse to ``(?+)``, so one query shape gets one label however many
+    ids it carries. The label is ``VERB table #hash``, short enough for a
+    Prometheus label; the normalized SQL goes to the slow-query log.
+    """
+    normalized = _COMMENTS.sub(" ", statement)
+    normalized = _STRINGS.sub("?", normalized)
+    normalized = _PLACEHOLDERS.sub("?", normalized)
+    normalized = _LISTS.sub("(?+)", normalized)
+    normalized = _REPEATED_LISTS.sub("(?+)", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+
+    verb = normalized.split(" ", 1)[0].upper() if normalized else "EMPTY"
+    table = _TABLE.search(normalized)
+    digest = hashlib.blake2b(normalized.encode(), digest_size=4).hexdigest()
+    label = f"{verb} {table.group(1)} #{digest}" if table else f"{verb} #{digest}"
+    return label, normalized
+
+
+def _shape(parameters: Any) -> Any:
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def parameter_shapes(parameters: Any, executemany: bool) -> Any:
+    """Types of the bound parameters (never the values, which may be customer data)"""
+    if executemany and parameters:
+        return {"sets": len(parameters), "each": _shape(parameters[0])}
+    return _shape(parameters)
+
+
+class StatementTimer:
+    """Engine event listeners for one pool.
+
+    ``rowcount`` is rows returned for buffered SELECTs on MySQL and rows
+    affected for writes; drivers that report -1 (SQLite SELECTs, the
+    server-side cursors used by exports) are not counted.
+    """
+
+    def __init__(self, pool_name: str, engine, slow_query_seconds: float = 0.5):
+        self.pool_name = pool_name
+        self.slow_query_seconds = slow_query_seconds
+        # label -> [calls, total seconds, max seconds, rows, normalized SQL]
+        self.stats: Dict[str, List[Any]] = {}
+
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._before)
+        event.listen(sync_engine, "after_cursor_execute", self._after)
+        event.listen(sync_engine, "handle_error", self._error)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        context._statement_started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        duration = time.perf_counter() - getattr(context, "_statement_started", time.perf_counter())
+        label, normalized = fingerprint(statement)
+        rows = cursor.rowcount if cursor is not None and cursor.rowcount >= 0 else 0
+
+        DB_STATEMENT_DURATION.labels(pool=self.pool_name, statement=label).observe(duration)
+        if rows:
+            DB_STATEMENT_ROWS.labels(pool=self.pool_name, statement=label).inc(rows)
+
+        stats = self.stats.get(label)
+        if stats is None:
+            stats = self.stats[label] = [0, 0.0, 0.0, 0, normalized]
+        stats[0] += 1
+        stats[1] += duration
+        stats[2] = max(stats[2], duration)
+        stats[3] += rows
+
+        if duration >= self.slow_query_seconds:
+            logger.warning(
+                "Slow query",
+                pool=self.pool_name,
+                statement=label,
+                sql=normalized[:1000],
+                duration_ms=round(duration * 1000, 2),
+                rows=rows,
+                parameters=parameter_shapes(parameters, executemany)
+            )
+
+    def _error(self, exception_context) -> None:
+        statement = exception_context.statement
+        if statement:
+            DB_STATEMENT_ERRORS.labels(pool=self.pool_name, statement=fingerprint(statement)[0]).inc()
+
+    def report(self, top: int = 20) -> List[Dict[str, Any]]:
+        """Statements with the most total time, for /debug/queries"""
+        ranked = sorted(self.stats.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        return [
+            {
+                "pool": self.pool_name,
+                "statement": label,
+                "calls": calls,
+                "total_ms": round(total * 1000, 2),
+                "mean_ms": round(total * 1000 / calls, 3),
+                "max_ms": round(longest * 1000, 2),
+                "rows": rows,
+                "sql": normalized,
+            }
+            for label, (calls, total, longest, rows, normalized) in ranked
+        ]
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """asyncio QueuePool that stamps each checkout with how long it waited.
+
+    The wait covers queueing for a free connection and opening a new one
+    when the pool is in overflow; the checkout listener in routing.Pool
+    turns it into a histogram.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        record = super()._do_get()
+        record.info[ACQUIRE_WAIT_KEY] = time.perf_counter() - started
+        return record
@@ -0,0 +1,51 @@
+"""
+Conditional GETs
+Strong ETags derived from a cheap catalog version, so unchanged pages are
+answered with 304 Not Modified before the page query runs
+"""
+
+import hashlib
+from datetime import date, datetime
+from typing import Any, Hashable
+
+from fastapi import Request
+from fastapi.responses import Response
+from prometheus_client import Counter
+
+# Prometheus metrics
+ETAG_NOT_MODIFIED = Counter('etag_not_modified_total', 'Conditional GETs answered with 304', ['endpoint'])
+
+
+def _part(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over the given parts (request key plus data version)"""
+    digest = hashlib.blake2b("|".join(_part(part) for part in parts).encode(), digest_size=12)
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 requires for this header)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str, endpoint: Hashable) -> Response:
+    ETAG_NOT_MODIFIED.labels(endpoint=endpoint).inc()
+    return Response(status_code=304, headers={"ETag": etag})
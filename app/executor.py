@@ -0,0 +1,112 @@
+"""
+CPU Executor Subsystem
+Process pool for CPU-heavy handlers with bounded queueing and back-pressure
+"""
+
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+import structlog
+from fastapi import HTTPException
+from prometheus_client import Counter, Gauge, Histogram
+
+from compute import timed_call
+from resources import container_cpu_count
+
+logger = structlog.get_logger()
+
+# Prometheus metrics
+EXECUTOR_QUEUE_DEPTH = Gauge('executor_queue_depth', 'Tasks waiting for a free executor worker')
+EXECUTOR_IN_FLIGHT = Gauge('executor_in_flight', 'Tasks queued or running on the executor')
+EXECUTOR_QUEUE_WAIT = Histogram('executor_queue_wait_seconds', 'Time tasks spent waiting for a worker', ['task'])
+EXECUTOR_RUN_TIME = Histogram('executor_run_seconds', 'Time tasks spent running in a worker', ['task'])
+EXECUTOR_REJECTED = Counter('executor_rejected_total', 'Tasks rejected by the executor', ['task', 'reason'])
+
+
+class CPUExecutor:
+    """Dispatches CPU-bound callables to a process pool.
+
+    At most ``max_workers + max_queue`` tasks are accepted at once; beyond that
+    callers get 429 so clients back off instead of piling up on the event loop.
+    Tasks that exceed ``timeout`` or hit a broken pool surface as 503.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue: int = 16, timeout: float = 30.0):
+        self.max_workers = max_workers or container_cpu_count()
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+
+    def start(self) -> None:
+        if self._pool is None:
+            # spawn keeps workers from inheriting the event loop, sockets and DB pool
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info("CPU executor started", workers=self.max_workers, max_queue=self.max_queue)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _update_gauges(self) -> None:
+        EXECUTOR_IN_FLIGHT.set(self._in_flight)
+        EXECUTOR_QUEUE_DEPTH.set(max(0, self._in_flight - self.max_workers))
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._update_gauges()
+
+    async def run(self, task: str, func: Callable[..., Any], *args) -> Any:
+        """Run func(*args) in the pool, returning its result"""
+        if self._in_flight >= self.max_workers + self.max_queue:
+            EXECUTOR_REJECTED.labels(task=task, reason="queue_full").inc()
+            raise HTTPException(status_code=429, detail="Executor queue full", headers={"Retry-After": "1"})
+
+        self.start()
+        loop = asyncio.get_running_loop()
+        submitted_at = time.perf_counter()
+        try:
+            work = self._pool.submit(timed_call, func, *args)
+        except BrokenProcessPool:
+            raise self._broken(task)
+
+        # The slot is held until the work item itself finishes (or is cancelled while
+        # still queued), not until the caller stops waiting, so timed-out work that is
+        # still running keeps counting against max_workers + max_queue
+        self._in_flight += 1
+        self._update_gauges()
+        work.add_done_callback(lambda _: self._release_threadsafe(loop))
+        try:
+            # On timeout wait_for cancels the wrapper, which cancels the work item if it
+            # hasn't started; running items can't be interrupted and finish in the background
+            result, run_time = await asyncio.wait_for(asyncio.wrap_future(work), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            EXECUTOR_REJECTED.labels(task=task, reason="timeout").inc()
+            raise HTTPException(status_code=503, detail="Computation timed out", headers={"Retry-After": "5"})
+        except BrokenProcessPool:
+            raise self._broken(task)
+
+        EXECUTOR_RUN_TIME.labels(task=task).observe(run_time)
+        EXECUTOR_QUEUE_WAIT.labels(task=task).observe(max(0.0, time.perf_counter() - submitted_at - run_time))
+        return result
+
+    def _release_threadsafe(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Done callbacks run on the pool's management thread
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            pass  # loop already closed at shutdown
+
+    def _broken(self, task: str) -> HTTPException:
+        EXECUTOR_REJECTED.labels(task=task, reason="broken_pool").inc()
+        logger.error("CPU executor pool broken, restarting", task=task)
+        self._pool = None
+        return HTTPException(status_code=503, detail="Executor unavailable", headers={"Retry-After": "1"})
@@ -0,0 +1,48 @@
+"""
+Fast JSON Serialization
+Column-projected rows encoded straight to bytes, bypassing ORM identity
+mapping and per-row Pydantic validation for list endpoints
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any, Dict, List, Type
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode to compact JSON bytes, matching FastAPI's output for our schemas"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def projected_columns(schema: Type[BaseModel], model) -> list:
+    """ORM columns for every field of a response schema, in schema order"""
+    return [getattr(model, field) for field in schema.model_fields]
+
+
+def rows_as_dicts(schema: Type[BaseModel], rows) -> List[Dict[str, Any]]:
+    """Turn column-projected row tuples into response dicts keyed like the schema"""
+    fields = tuple(schema.model_fields)
+    return [dict(zip(fields, row)) for row in rows]
@@ -0,0 +1,45 @@
+"""
+Gunicorn Configuration
+Multi-process serving with uvicorn workers; each worker builds its own
+engine, pools and executor in the app lifespan, after the fork
+
+  gunicorn main:app -c gunicorn.conf.py
+"""
+
+import os
+import shutil
+
+from resources import container_cpu_count
+
+# Must be set before any worker imports prometheus_client
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-multiproc")
+
+workers = int(os.getenv("WEB_CONCURRENCY") or container_cpu_count())
+# Workers read this to split DB_CONNECTION_BUDGET and the CPU executor between them
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = os.getenv("BIND", "0.0.0.0:8080")
+# The app must be imported per worker: engines, event loops and boto3 clients don't survive a fork
+preload_app = False
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+loglevel = "info"
+
+
+def on_starting(server):
+    # Metric files from a previous run would be summed into this one
+    directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
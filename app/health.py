@@ -0,0 +1,130 @@
+"""
+Background Health Prober
+Refreshes database, memory and disk status on an interval so /health can
+answer from an in-memory snapshot instead of touching the pool per request
+"""
+
+import asyncio
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Optional
+
+import structlog
+from sqlalchemy import text
+
+logger = structlog.get_logger()
+
+
+def _percentile(ordered, fraction: float) -> float:
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _system_usage() -> Dict[str, Any]:
+    # psutil reads /proc synchronously; called via asyncio.to_thread (and imported there too)
+    import psutil
+
+    memory = psutil.virtual_memory()
+    disk = psutil.disk_usage('/')
+    return {
+        "memory_usage": {"percent": memory.percent, "available_gb": round(memory.available / 1024**3, 2)},
+        "disk_usage": {"percent": disk.percent, "free_gb": round(disk.free / 1024**3, 2)}
+    }
+
+
+class HealthProber:
+    """Periodically probes dependencies and keeps the latest snapshot.
+
+    ``session_factory`` is called on every probe so it always uses the current
+    session maker. DB ping latencies are kept in a rolling window and reported
+    as percentiles alongside the latest sample.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        interval_seconds: float = 5.0,
+        max_staleness_seconds: Optional[float] = None,
+        window: int = 120,
+        db_latency_histogram=None
+    ):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.max_staleness_seconds = max_staleness_seconds or interval_seconds * 3
+        self.db_latency_histogram = db_latency_histogram
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+        self.snapshot: Dict[str, Any] = {}
+        self.checked_at: Optional[float] = None
+
+    async def _probe_database(self) -> Dict[str, Any]:
+        try:
+            async with self.session_factory() as session:
+                start_time = time.perf_counter()
+                await asyncio.wait_for(session.execute(text("SELECT 1")), timeout=self.interval_seconds)
+                db_duration = time.perf_counter() - start_time
+        except Exception as e:
+            logger.warning("Health probe: database check failed", error=str(e))
+            return {"status": "error", "error": str(e)}
+
+        if self.db_latency_histogram is not None:
+            self.db_latency_histogram.observe(db_duration)
+        self._latencies.append(db_duration)
+        ordered = sorted(self._latencies)
+        return {
+            "status": "ok",
+            "response_time_ms": round(db_duration * 1000, 2),
+            "latency_ms": {
+                "p50": round(_percentile(ordered, 0.50) * 1000, 2),
+                "p90": round(_percentile(ordered, 0.90) * 1000, 2),
+                "p99": round(_percentile(ordered, 0.99) * 1000, 2),
+                "samples": len(ordered)
+            }
+        }
+
+    async def probe_once(self) -> None:
+        database, system = await asyncio.gather(
+            self._probe_database(),
+            asyncio.to_thread(_system_usage)
+        )
+        self.snapshot = {"database": database, **system}
+        self.checked_at = time.time()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.probe_once()
+            except Exception as e:
+                logger.error("Health probe failed", error=str(e))
+
+    async def start(self) -> None:
+        await self.probe_once()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def report(self) -> Dict[str, Any]:
+        """Return the current snapshot with its age; constant time"""
+        if self.checked_at is None:
+            return {"healthy": False, "checked_at": None, "staleness_seconds": None, "checks": {}}
+
+        staleness = time.time() - self.checked_at
+        healthy = (
+            self.snapshot.get("database", {}).get("status") == "ok"
+            and staleness <= self.max_staleness_seconds
+        )
+        return {
+            "healthy": healthy,
+            "checked_at": datetime.utcfromtimestamp(self.checked_at).isoformat(),
+            "staleness_seconds": round(staleness, 3),
+            "checks": self.snapshot
+        }
@@ -0,0 +1,214 @@
+"""
+Latency Recording for the Load Tester
+HDR-style log-bucketed histograms with fixed memory, O(1) recording and
+mergeable snapshots
+"""
+
+import time
+from array import array
+from typing import Any, Dict, Optional
+
+# 7 bits of sub-bucket resolution keeps every bucket within ~0.8% of its value
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT >> 1
+# Values are recorded in microseconds; anything above ~1 hour is clamped
+MAX_TRACKABLE_US = 1 << 32
+BUCKET_COUNT = ((MAX_TRACKABLE_US.bit_length() - SUB_BUCKET_BITS) + 1) * SUB_BUCKET_HALF + SUB_BUCKET_HALF
+
+
+def _index(value_us: int) -> int:
+    if value_us < SUB_BUCKET_COUNT:
+        return value_us
+    shift = value_us.bit_length() - SUB_BUCKET_BITS
+    return shift * SUB_BUCKET_HALF + (value_us >> shift)
+
+
+def _highest_equivalent(index: int) -> int:
+    """Largest microsecond value that lands in bucket ``index``"""
+    if index < SUB_BUCKET_COUNT:
+        return index
+    shift = index // SUB_BUCKET_HALF - 1
+    return ((index - shift * SUB_BUCKET_HALF) << shift) + (1 << shift) - 1
+
+
+class LatencyHistogram:
+    """Log-linear histogram of latencies, stored as one fixed array of counts"""
+
+    __slots__ = ("counts", "total", "min_us", "max_us", "sum_us")
+
+    def __init__(self):
+        self.counts = array('Q', bytes(8 * BUCKET_COUNT))
+        self.total = 0
+        self.min_us = 0
+        self.max_us = 0
+        self.sum_us = 0
+
+    def record(self, seconds: float) -> None:
+        value_us = min(max(int(seconds * 1_000_000), 0), MAX_TRACKABLE_US - 1)
+        self.counts[_index(value_us)] += 1
+        if self.total == 0 or value_us < self.min_us:
+            self.min_us = value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+        self.total += 1
+        self.sum_us += value_us
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if other.total == 0:
+            return
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.min_us = other.min_us if self.total == 0 else min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+        self.total += other.total
+        self.sum_us += other.sum_us
+
+    def percentile(self, percent: float) -> float:
+        """Latency in seconds at ``percent`` (0-100)"""
+        if self.total == 0:
+            return 0.0
+        target = max(1, int(round(percent / 100.0 * self.total + 0.4999)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(_highest_equivalent(index), self.max_us) / 1_000_000
+        return self.max_us / 1_000_000
+
+    @property
+    def mean(self) -> float:
+        return self.sum_us / self.total / 1_000_000 if self.total else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Sparse, JSON-serializable form suitable for sending between processes"""
+        return {
+            "counts": {index: count for index, count in enumerate(self.counts) if count},
+            "total": self.total,
+            "min_us": self.min_us,
+            "max_us": self.max_us,
+            "sum_us": self.sum_us,
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls()
+        for index, count in data["counts"].items():
+            histogram.counts[int(index)] = count
+        histogram.total = data["total"]
+        histogram.min_us = data["min_us"]
+        histogram.max_us = data["max_us"]
+        histogram.sum_us = data["sum_us"]
+        return histogram
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.total,
+            "avg": self.mean,
+            "min": self.min_us / 1_000_000,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+            "max": self.max_us / 1_000_000,
+        }
+
+
+def status_class(status_code: int) -> str:
+    return f"{status_code // 100}xx" if status_code else "error"
+
+
+class LatencyRecorder:
+    """Per-endpoint and per-status-class histograms plus per-second counters.
+
+    Memory is fixed per endpoint/status class, plus three integers for each
+    second of test time.
+    """
+
+    def __init__(self):
+        self.endpoints: Dict[str, LatencyHistogram] = {}
+        self.endpoint_failures: Dict[str, int] = {}
+        self.status_classes: Dict[str, LatencyHistogram] = {}
+        self.timeseries: Dict[int, list] = {}  # second -> [requests, failures, bytes]
+        self.first_timestamp: Optional[float] = None
+        self.last_timestamp: Optional[float] = None
+
+    def record(
+        self,
+        endpoint: str,
+        status_code: int,
+        response_time: float,
+        success: bool,
+        response_size: int = 0,
+        timestamp: Optional[float] = None
+    ) -> None:
+        timestamp = timestamp if timestamp is not None else time.time()
+        if self.first_timestamp is None or timestamp < self.first_timestamp:
+            self.first_timestamp = timestamp
+        if self.last_timestamp is None or timestamp > self.last_timestamp:
+            self.last_timestamp = timestamp
+
+        histogram = self.endpoints.get(endpoint)
+        if histogram is None:
+            histogram = self.endpoints[endpoint] = LatencyHistogram()
+            self.endpoint_failures[endpoint] = 0
+        if success:
+            histogram.record(response_time)
+        else:
+            self.endpoint_failures[endpoint] += 1
+
+        klass = status_class(status_code)
+        by_status = self.status_classes.get(klass)
+        if by_status is None:
+            by_status = self.status_classes[klass] = LatencyHistogram()
+        by_status.record(response_time)
+
+        bucket = self.timeseries.get(int(timestamp))
+        if bucket is None:
+            bucket = self.timeseries[int(timestamp)] = [0, 0, 0]
+        bucket[0] += 1
+        bucket[1] += 0 if success else 1
+        bucket[2] += response_size
+
+    def merge(self, other: "LatencyRecorder") -> None:
+        for endpoint, histogram in other.endpoints.items():
+            self.endpoints.setdefault(endpoint, LatencyHistogram()).merge(histogram)
+            self.endpoint_failures[endpoint] = self.endpoint_failures.get(endpoint, 0) + other.endpoint_failures[endpoint]
+        for klass, histogram in other.status_classes.items():
+            self.status_classes.setdefault(klass, LatencyHistogram()).merge(histogram)
+        for second, (requests, failures, size) in other.timeseries.items():
+            bucket = self.timeseries.setdefault(second, [0, 0, 0])
+            bucket[0] += requests
+            bucket[1] += failures
+            bucket[2] += size
+        for timestamp in (other.first_timestamp, other.last_timestamp):
+            if timestamp is not None:
+                self.first_timestamp = timestamp if self.first_timestamp is None else min(self.first_timestamp, timestamp)
+                self.last_timestamp = timestamp if self.last_timestamp is None else max(self.last_timestamp, timestamp)
+
+    @property
+    def total_requests(self) -> int:
+        return sum(h.total for h in self.endpoints.values()) + sum(self.endpoint_failures.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "endpoints": {endpoint: h.snapshot() for endpoint, h in self.endpoints.items()},
+            "endpoint_failures": dict(self.endpoint_failures),
+            "status_classes": {klass: h.snapshot() for klass, h in self.status_classes.items()},
+            "timeseries": {second: list(bucket) for second, bucket in self.timeseries.items()},
+            "first_timestamp": self.first_timestamp,
+            "last_timestamp": self.last_timestamp,
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: Dict[str, Any]) -> "LatencyRecorder":
+        recorder = cls()
+        recorder.endpoints = {e: LatencyHistogram.from_snapshot(h) for e, h in data["endpoints"].items()}
+        recorder.endpoint_failures = dict(data["endpoint_failures"])
+        recorder.status_classes = {k: LatencyHistogram.from_snapshot(h) for k, h in data["status_classes"].items()}
+        recorder.timeseries = {int(second): list(bucket) for second, bucket in data["timeseries"].items()}
+        recorder.first_timestamp = data["first_timestamp"]
+        recorder.last_timestamp = data["last_timestamp"]
+        return recorder
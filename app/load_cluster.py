@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Distributed Load Generation
+Runs LoadTester in several processes (and optionally several machines) and
+merges their latency snapshots live
+
+  python load_test.py --workers 8 --mode open --rate 20000
+  python load_test.py --coordinator 0.0.0.0:5557 --agents 2 --mode open --rate 40000
+  python load_test.py --agent coordinator-host:5557 --workers 8   # on each box
+"""
+
+import asyncio
+import json
+import multiprocessing
+import queue
+import socket
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from latency import LatencyRecorder
+from load_test import LoadTester, print_report, test_config
+
+# Seconds between snapshots sent from workers (and agents) to the coordinator
+SNAPSHOT_INTERVAL = 1.0
+
+
+def slice_config(config: Dict[str, Any], parts: int, index: int) -> Dict[str, Any]:
+    """Give one of ``parts`` generators its share of the target load"""
+    share = dict(config)
+    for key in ("rate", "rate_end"):
+        if share.get(key) is not None:
+            share[key] = share[key] / parts
+    if share.get("steps"):
+        share["steps"] = [step / parts for step in share["steps"]]
+    # Spread closed-loop users so the total matches even when it doesn't divide evenly
+    share["users"] = config["users"] // parts + (1 if index < config["users"] % parts else 0)
+    return share
+
+
+async def _worker_loop(worker_id: int, config: Dict[str, Any], messages) -> None:
+    if config["mode"] == "closed" and config["users"] == 0:
+        return  # more workers than users
+    tester = LoadTester(config["url"], config["users"])
+
+    async def report_periodically():
+        while True:
+            await asyncio.sleep(SNAPSHOT_INTERVAL)
+            flush()
+
+    def flush():
+        # Swap the recorder so each snapshot is a delta and worker memory stays flat
+        recorder, tester.recorder = tester.recorder, LatencyRecorder()
+        if recorder.total_requests:
+            messages.put(("snapshot", worker_id, recorder.snapshot()))
+
+    reporter = asyncio.create_task(report_periodically())
+    try:
+        await tester.run(config, create_data=False)
+    finally:
+        reporter.cancel()
+        flush()
+
+
+def _worker_main(worker_id: int, config: Dict[str, Any], messages) -> None:
+    """Process entry point: one event loop per worker"""
+    try:
+        asyncio.run(_worker_loop(worker_id, config, messages))
+    finally:
+        messages.put(("done", worker_id, None))
+
+
+class Coordinator:
+    """Merges snapshots from workers or agents and prints live progress"""
+
+    def __init__(self):
+        self.recorder = LatencyRecorder()
+        self._window_requests = 0
+        self._window_started = time.time()
+
+    def merge(self, snapshot: Dict[str, Any]) -> None:
+        delta = LatencyRecorder.from_snapshot(snapshot)
+        self.recorder.merge(delta)
+        self._window_requests += delta.total_requests
+
+    def progress(self) -> None:
+        now = time.time()
+        elapsed = now - self._window_started
+        if elapsed < SNAPSHOT_INTERVAL:
+            return
+        print(f"  {self.recorder.total_requests:>10} requests | {self._window_requests / elapsed:8.1f} req/s")
+        self._window_requests = 0
+        self._window_started = now
+
+    def drain(self, messages, producers: int) -> None:
+        """Consume messages until every producer reported done"""
+        remaining = producers
+        while remaining:
+            try:
+                kind, _, payload = messages.get(timeout=SNAPSHOT_INTERVAL)
+            except queue.Empty:
+                self.progress()
+                continue
+            if kind == "snapshot":
+                self.merge(payload)
+            else:
+                remaining -= 1
+            self.progress()
+
+    def report(self, url: str, output: Optional[str]) -> None:
+        tester = LoadTester(url)
+        tester.recorder = self.recorder
+        print_report(tester.generate_report(), output)
+
+
+def run_workers(config: Dict[str, Any], workers: int, messages) -> list:
+    """Fork ``workers`` generator processes that send snapshots to ``messages``"""
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(target=_worker_main, args=(i, slice_config(config, workers, i), messages), daemon=True)
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    return processes
+
+
+def _seed_data(config: Dict[str, Any]) -> None:
+    print("Creating test data...")
+    asyncio.run(LoadTester(config["url"]).create_test_data())
+
+
+def run_local(args) -> None:
+    config = test_config(args)
+    _seed_data(config)
+
+    print(f"Starting {config['mode']}-loop test on {args.workers} worker processes for {config['duration']} seconds...")
+    messages = multiprocessing.get_context("fork").Queue()
+    processes = run_workers(config, args.workers, messages)
+
+    coordinator = Coordinator()
+    coordinator.drain(messages, len(processes))
+    for process in processes:
+        process.join()
+
+    print("Load test completed!")
+    coordinator.report(config["url"], args.output)
+
+
+def _split_address(address: str):
+    host, _, port = address.rpartition(":")
+    return host or "0.0.0.0", int(port)
+
+
+def _read_agent(connection: socket.socket, agent_id: int, messages: "queue.Queue") -> None:
+    # Agents send newline-delimited JSON: {"snapshot": {...}} or {"done": true}
+    with connection, connection.makefile("r") as stream:
+        for line in stream:
+            message = json.loads(line)
+            if "snapshot" in message:
+                messages.put(("snapshot", agent_id, message["snapshot"]))
+            if message.get("done"):
+                break
+    messages.put(("done", agent_id, None))
+
+
+def run_coordinator(args) -> None:
+    config = test_config(args)
+    host, port = _split_address(args.coordinator)
+
+    server = socket.create_server((host, port))
+    print(f"Waiting for {args.agents} agent(s) on {host}:{port}...")
+    connections = []
+    while len(connections) < args.agents:
+        connection, peer = server.accept()
+        print(f"  agent connected from {peer[0]}:{peer[1]}")
+        connections.append(connection)
+    server.close()
+
+    _seed_data(config)
+    messages: "queue.Queue" = queue.Queue()
+    for agent_id, connection in enumerate(connections):
+        share = slice_config(config, len(connections), agent_id)
+        connection.sendall((json.dumps(share) + "\n").encode())
+        threading.Thread(target=_read_agent, args=(connection, agent_id, messages), daemon=True).start()
+
+    print(f"Starting {config['mode']}-loop test across {len(connections)} agent(s) for {config['duration']} seconds...")
+    coordinator = Coordinator()
+    coordinator.drain(messages, len(connections))
+
+    print("Load test completed!")
+    coordinator.report(config["url"], args.output)
+
+
+def run_agent(args) -> None:
+    host, port = _split_address(args.agent)
+    connection = socket.create_connection((host, port))
+    print(f"Connected to coordinator {host}:{port}, waiting for test config...")
+
+    with connection, connection.makefile("rw") as stream:
+        config = json.loads(stream.readline())
+        print(f"Running {config['mode']}-loop share on {args.workers} worker processes...")
+
+        messages = multiprocessing.get_context("fork").Queue()
+        processes = run_workers(config, args.workers, messages)
+
+        # Merge locally and forward one snapshot per interval to keep coordinator traffic low
+        remaining = len(processes)
+        pending = LatencyRecorder()
+        last_sent = time.time()
+        while remaining:
+            try:
+                kind, _, payload = messages.get(timeout=SNAPSHOT_INTERVAL)
+                if kind == "snapshot":
+                    pending.merge(LatencyRecorder.from_snapshot(payload))
+                else:
+                    remaining -= 1
+            except queue.Empty:
+                pass
+            if pending.total_requests and (time.time() - last_sent >= SNAPSHOT_INTERVAL or not remaining):
+                stream.write(json.dumps({"snapshot": pending.snapshot()}) + "\n")
+                stream.flush()
+                pending = LatencyRecorder()
+                last_sent = time.time()
+
+        stream.write(json.dumps({"done": True}) + "\n")
+        stream.flush()
+
+    for process in processes:
+        process.join()
+    print("Agent finished")
+
+
+def run(args) -> None:
+    """Entry point used by load_test.py for --workers, --coordinator and --agent"""
+    if args.coordinator:
+        run_coordinator(args)
+    elif args.agent:
+        run_agent(args)
+    else:
+        run_local(args)
@@ -2,25 +2,88 @@
 """
 Load Testing Script for Enterprise E-commerce API
 Uses asyncio and httpx for high-performance testing
+
+Two modes:
+  closed - concurrent users each walk a session, in waves (default)
+  open   - requests are scheduled at a target arrival rate regardless of how
+           fast the server answers; latency is measured from the intended
+           send time so server stalls are not hidden (no coordinated omission)
+
+Either mode can be spread over several processes (--workers N) or several
+machines (--coordinator / --agent), see load_cluster.py.
 """
 
 import asyncio
 import httpx
+import itertools
+import random
 import time
 import json
-import statistics
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 from faker import Faker
 import argparse
 
+from latency import LatencyHistogram, LatencyRecorder
+
 fake = Faker()
 
+# Request mix shared by both modes (a typical user journey)
+REQUEST_MIX = [
+    ("GET", "/"),
+    ("GET", "/health"),
+    ("GET", "/categories"),
+    ("GET", "/products?limit=20"),
+    ("GET", "/products?category_id=1&min_price=10&max_price=100"),
+    ("GET", "/products/1"),
+    ("GET", "/compute/fibonacci/25?mode=naive"),  # CPU intensive
+    ("GET", "/metrics"),
+]
+
+def arrival_schedule(
+    profile: str,
+    rate: float,
+    duration: float,
+    rate_end: Optional[float] = None,
+    steps: Optional[List[float]] = None,
+    seed: Optional[int] = None
+) -> Iterator[float]:
+    """Yield intended send offsets (seconds from start) for an open-loop test.
+    
+    constant - fixed interval of 1/rate
+    ramp     - rate changes linearly from rate to rate_end over the test
+    step     - rate walks through steps, spending duration/len(steps) on each
+    poisson  - exponential inter-arrival times with mean rate (bursty traffic)
+    """
+    rng = random.Random(seed)
+    t = 0.0
+    while t < duration:
+        if profile == "ramp":
+            current = rate + ((rate_end or rate) - rate) * (t / duration)
+        elif profile == "step" and steps:
+            current = steps[min(len(steps) - 1, int(t / (duration / len(steps))))]
+        else:
+            current = rate
+        
+        if current <= 0:
+            t += 0.1
+            continue
+        
+        yield t
+        t += rng.expovariate(current) if profile == "poisson" else 1.0 / current
+
 class LoadTester:
     def __init__(self, base_url: str, concurrent_users: int = 10):
         self.base_url = base_url.rstrip('/')
         self.concurrent_users = concurrent_users
-        self.results = []
+        self.recorder = LatencyRecorder()
         
+    def record(self, result: Dict[str, Any]):
+        """Fold one request result into the latency histograms"""
+        self.recorder.record(
+            result["endpoint"], result["status_code"], result["response_time"],
+            result["success"], result["response_size"], result.get("timestamp")
+        )
+    
     async def make_request(self, client: httpx.AsyncClient, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         """Make a single HTTP request and measure performance"""
         start_time = time.time()
@@ -52,22 +115,10 @@ class LoadTester:
         """Simulate a typical user session"""
         async with httpx.AsyncClient(timeout=30.0) as client:
             # User journey: Browse categories -> Browse products -> Get specific product -> Compute fibonacci
-            requests = [
-                ("GET", "/"),
-                ("GET", "/health"),
-                ("GET", "/categories"),
-                ("GET", "/products?limit=20"),
-                ("GET", "/products?category_id=1&min_price=10&max_price=100"),
-                ("GET", "/products/1"),
-                ("GET", "/compute/fibonacci/25"),  # CPU intensive
-                ("GET", "/metrics"),
-            ]
-            
-            for method, endpoint in requests:
+            for method, endpoint in REQUEST_MIX:
                 result = await self.make_request(client, method, endpoint)
-                result["user_id"] = user_id
                 result["timestamp"] = time.time()
-                self.results.append(result)
+                self.record(result)
                 
                 # Small delay between requests to simulate real user behavior
                 await asyncio.sleep(0.1)
@@ -94,27 +145,29 @@ class LoadTester:
                 except:
                     pass  # Category might already exist
                     
-            # Create products
+            # Create products in one bulk request (duplicates are reported, not fatal)
+            products = []
             for i in range(50):
                 category_id = fake.random_element(category_ids) if category_ids else 1
-                product = {
+                products.append({
                     "name": fake.catch_phrase(),
                     "description": fake.text(max_nb_chars=200),
                     "price": round(fake.random.uniform(10.0, 500.0), 2),
                     "stock_quantity": fake.random_int(min=0, max=100),
                     "category_id": category_id,
                     "sku": fake.uuid4()[:8].upper()
-                }
-                
-                try:
-                    await client.post(f"{self.base_url}/products", json=product)
-                except:
-                    pass  # Product might already exist or fail validation
+                })
+            
+            try:
+                await client.post(f"{self.base_url}/products/bulk", json=products)
+            except:
+                pass  # Older deployments without the bulk endpoint
     
-    async def run_load_test(self, duration_seconds: int = 60):
+    async def run_load_test(self, duration_seconds: int = 60, create_data: bool = True):
         """Run the load test for specified duration"""
-        print(f"Creating test data...")
-        await self.create_test_data()
+        if create_data:
+            print(f"Creating test data...")
+            await self.create_test_data()
         
         print(f"Starting load test with {self.concurrent_users} concurrent users for {duration_seconds} seconds...")
         start_time = time.time()
@@ -133,110 +186,224 @@ class LoadTester:
         
         print("Load test completed!")
     
-    def generate_report(self) -> Dict[str, Any]:
-        """Generate performance report from test results"""
-        if not self.results:
-            return {"error": "No test results available"}
-        
-        successful_requests = [r for r in self.results if r["success"]]
-        failed_requests = [r for r in self.results if not r["success"]]
+    async def fire(self, client: httpx.AsyncClient, method: str, endpoint: str, intended: float):
+        """Send one open-loop request; response_time counts from the intended send time"""
+        send_time = time.perf_counter()
+        result = await self.make_request(client, method, endpoint)
+        completed = time.perf_counter()
+        result["response_time"] = completed - intended
+        result["service_time"] = completed - send_time
+        result["timestamp"] = time.time()
+        self.record(result)
+    
+    async def run_open_loop(
+        self,
+        duration_seconds: int = 60,
+        rate: float = 100.0,
+        profile: str = "constant",
+        rate_end: Optional[float] = None,
+        steps: Optional[List[float]] = None,
+        max_connections: int = 1000,
+        max_in_flight: int = 50000,
+        create_data: bool = True
+    ):
+        """Schedule requests at a target arrival rate over one pooled client"""
+        if create_data:
+            print(f"Creating test data...")
+            await self.create_test_data()
         
-        response_times = [r["response_time"] for r in successful_requests]
+        print(f"Starting open-loop test ({profile}, {rate} req/s) for {duration_seconds} seconds...")
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        in_flight = set()
+        missed = 0
         
-        # Group by endpoint
-        endpoint_stats = {}
-        for result in self.results:
-            endpoint = result["endpoint"]
-            if endpoint not in endpoint_stats:
-                endpoint_stats[endpoint] = {
-                    "total_requests": 0,
-                    "successful_requests": 0,
-                    "failed_requests": 0,
-                    "response_times": [],
-                    "avg_response_size": 0
-                }
+        async with httpx.AsyncClient(timeout=30.0, limits=limits) as client:
+            mix = itertools.cycle(REQUEST_MIX)
+            start = time.perf_counter()
             
-            stats = endpoint_stats[endpoint]
-            stats["total_requests"] += 1
+            for offset in arrival_schedule(profile, rate, duration_seconds, rate_end, steps):
+                intended = start + offset
+                delay = intended - time.perf_counter()
+                # Sleep only when meaningfully ahead; when behind, fire immediately
+                # and let the intended timestamp account for the lag
+                if delay > 0.001:
+                    await asyncio.sleep(delay)
+                
+                method, endpoint = next(mix)
+                if len(in_flight) >= max_in_flight:
+                    missed += 1
+                    self.record({
+                        "method": method, "endpoint": endpoint, "status_code": 0,
+                        "response_time": time.perf_counter() - intended, "success": False,
+                        "error": "generator in-flight limit reached", "response_size": 0,
+                        "timestamp": time.time()
+                    })
+                    continue
+                
+                task = asyncio.create_task(self.fire(client, method, endpoint, intended))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
             
-            if result["success"]:
-                stats["successful_requests"] += 1
-                stats["response_times"].append(result["response_time"])
-            else:
-                stats["failed_requests"] += 1
+            if in_flight:
+                await asyncio.gather(*in_flight)
         
-        # Calculate endpoint statistics
-        for endpoint, stats in endpoint_stats.items():
-            if stats["response_times"]:
-                times = stats["response_times"]
+        if missed:
+            print(f"Warning: {missed} requests not sent (generator in-flight limit reached)")
+        print("Load test completed!")
+    
+    async def run(self, config: Dict[str, Any], create_data: bool = True):
+        """Run the test described by a config dict (see test_config)"""
+        if config["mode"] == "open":
+            await self.run_open_loop(
+                config["duration"], config["rate"], config["profile"],
+                rate_end=config["rate_end"], steps=config["steps"],
+                max_connections=config["max_connections"], create_data=create_data
+            )
+        else:
+            await self.run_load_test(config["duration"], create_data=create_data)
+    
+    def generate_report(self) -> Dict[str, Any]:
+        """Generate performance report from the latency histograms"""
+        recorder = self.recorder
+        total_requests = recorder.total_requests
+        if not total_requests:
+            return {"error": "No test results available"}
+        
+        # Response times cover successful requests, as per endpoint
+        successful = LatencyHistogram()
+        for histogram in recorder.endpoints.values():
+            successful.merge(histogram)
+        failed_requests = total_requests - successful.total
+        overall = successful.summary()
+        
+        endpoint_stats = {}
+        for endpoint, histogram in recorder.endpoints.items():
+            failures = recorder.endpoint_failures[endpoint]
+            stats = {
+                "total_requests": histogram.total + failures,
+                "successful_requests": histogram.total,
+                "failed_requests": failures,
+                "success_rate": (histogram.total / (histogram.total + failures)) * 100
+            }
+            if histogram.total:
+                summary = histogram.summary()
                 stats.update({
-                    "avg_response_time": statistics.mean(times),
-                    "min_response_time": min(times),
-                    "max_response_time": max(times),
-                    "p95_response_time": statistics.quantiles(times, n=20)[18] if len(times) > 1 else times[0],
-                    "p99_response_time": statistics.quantiles(times, n=100)[98] if len(times) > 1 else times[0]
+                    "avg_response_time": summary["avg"],
+                    "min_response_time": summary["min"],
+                    "max_response_time": summary["max"],
+                    "p50_response_time": summary["p50"],
+                    "p90_response_time": summary["p90"],
+                    "p95_response_time": summary["p95"],
+                    "p99_response_time": summary["p99"],
+                    "p999_response_time": summary["p999"]
                 })
-            
-            stats["success_rate"] = (stats["successful_requests"] / stats["total_requests"]) * 100
+            endpoint_stats[endpoint] = stats
+        
+        elapsed = (recorder.last_timestamp or 0) - (recorder.first_timestamp or 0)
+        start_second = min(recorder.timeseries) if recorder.timeseries else 0
         
         return {
             "summary": {
-                "total_requests": len(self.results),
-                "successful_requests": len(successful_requests),
-                "failed_requests": len(failed_requests),
-                "success_rate": (len(successful_requests) / len(self.results)) * 100,
-                "avg_response_time": statistics.mean(response_times) if response_times else 0,
-                "min_response_time": min(response_times) if response_times else 0,
-                "max_response_time": max(response_times) if response_times else 0,
-                "p95_response_time": statistics.quantiles(response_times, n=20)[18] if len(response_times) > 1 else 0,
-                "p99_response_time": statistics.quantiles(response_times, n=100)[98] if len(response_times) > 1 else 0,
-                "requests_per_second": len(self.results) / (max([r["timestamp"] for r in self.results]) - min([r["timestamp"] for r in self.results])) if len(self.results) > 1 else 0
+                "total_requests": total_requests,
+                "successful_requests": successful.total,
+                "failed_requests": failed_requests,
+                "success_rate": (successful.total / total_requests) * 100,
+                "avg_response_time": overall["avg"],
+                "min_response_time": overall["min"],
+                "max_response_time": overall["max"],
+                "p50_response_time": overall["p50"],
+                "p90_response_time": overall["p90"],
+                "p95_response_time": overall["p95"],
+                "p99_response_time": overall["p99"],
+                "p999_response_time": overall["p999"],
+                "requests_per_second": total_requests / elapsed if elapsed > 0 else 0
             },
-            "endpoint_details": endpoint_stats
+            "endpoint_details": endpoint_stats,
+            "status_classes": {klass: histogram.summary() for klass, histogram in recorder.status_classes.items()},
+            "timeseries": [
+                {"second": second - start_second, "requests": requests, "failures": failures, "bytes": size}
+                for second, (requests, failures, size) in sorted(recorder.timeseries.items())
+            ]
         }
 
-async def main():
+def test_config(args) -> Dict[str, Any]:
+    """Serializable test description shared with worker processes and agents"""
+    return {
+        "url": args.url,
+        "mode": args.mode,
+        "users": args.users,
+        "duration": args.duration,
+        "rate": args.rate,
+        "profile": args.profile,
+        "rate_end": args.rate_end,
+        "steps": [float(step) for step in args.steps.split(",")] if args.steps else None,
+        "max_connections": args.max_connections,
+    }
+
+def print_report(report: Dict[str, Any], output: Optional[str] = None):
+    print("\n" + "="*60)
+    print("LOAD TEST RESULTS")
+    print("="*60)
+    
+    if "error" in report:
+        print(report["error"])
+        return
+    
+    summary = report["summary"]
+    print(f"Total Requests: {summary['total_requests']}")
+    print(f"Successful: {summary['successful_requests']} ({summary['success_rate']:.1f}%)")
+    print(f"Failed: {summary['failed_requests']}")
+    print(f"Requests/sec: {summary['requests_per_second']:.1f}")
+    print(f"Avg Response Time: {summary['avg_response_time']*1000:.1f}ms")
+    print(f"50th Percentile: {summary['p50_response_time']*1000:.1f}ms")
+    print(f"95th Percentile: {summary['p95_response_time']*1000:.1f}ms")
+    print(f"99th Percentile: {summary['p99_response_time']*1000:.1f}ms")
+    print(f"99.9th Percentile: {summary['p999_response_time']*1000:.1f}ms")
+    print(f"Max Response Time: {summary['max_response_time']*1000:.1f}ms")
+    
+    print("\nEndpoint Performance:")
+    print("-" * 60)
+    for endpoint, stats in report["endpoint_details"].items():
+        print(f"{endpoint:30} | {stats['success_rate']:5.1f}% | {stats.get('avg_response_time', 0)*1000:6.1f}ms")
+    
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"\nDetailed results saved to: {output}")
+
+def parse_args():
     parser = argparse.ArgumentParser(description="Load test the Enterprise E-commerce API")
     parser.add_argument("--url", default="http://localhost:8080", help="Base URL of the API")
     parser.add_argument("--users", type=int, default=10, help="Number of concurrent users")
     parser.add_argument("--duration", type=int, default=60, help="Test duration in seconds")
     parser.add_argument("--output", help="Output file for results (JSON)")
-    
-    args = parser.parse_args()
-    
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed", help="Closed-loop users or open-loop arrival rate")
+    parser.add_argument("--rate", type=float, default=100.0, help="Open loop: target requests/sec (start rate for ramp)")
+    parser.add_argument("--profile", choices=["constant", "ramp", "step", "poisson"], default="constant", help="Open loop: arrival profile")
+    parser.add_argument("--rate-end", type=float, help="Open loop: final requests/sec for the ramp profile")
+    parser.add_argument("--steps", help="Open loop: comma-separated requests/sec for the step profile, e.g. 100,200,400")
+    parser.add_argument("--max-connections", type=int, default=1000, help="Open loop: connection pool size")
+    parser.add_argument("--workers", type=int, default=1, help="Generator processes on this machine, each with its own event loop")
+    parser.add_argument("--coordinator", metavar="HOST:PORT", help="Listen for agents and merge their results")
+    parser.add_argument("--agents", type=int, default=1, help="Coordinator: number of agents to wait for")
+    parser.add_argument("--agent", metavar="HOST:PORT", help="Run as an agent of the coordinator at HOST:PORT")
+    return parser.parse_args()
+
+async def main(args):
     tester = LoadTester(args.url, args.users)
     
     try:
-        await tester.run_load_test(args.duration)
-        report = tester.generate_report()
-        
-        print("\n" + "="*60)
-        print("LOAD TEST RESULTS")
-        print("="*60)
-        
-        summary = report["summary"]
-        print(f"Total Requests: {summary['total_requests']}")
-        print(f"Successful: {summary['successful_requests']} ({summary['success_rate']:.1f}%)")
-        print(f"Failed: {summary['failed_requests']}")
-        print(f"Requests/sec: {summary['requests_per_second']:.1f}")
-        print(f"Avg Response Time: {summary['avg_response_time']*1000:.1f}ms")
-        print(f"95th Percentile: {summary['p95_response_time']*1000:.1f}ms")
-        print(f"99th Percentile: {summary['p99_response_time']*1000:.1f}ms")
-        
-        print("\nEndpoint Performance:")
-        print("-" * 60)
-        for endpoint, stats in report["endpoint_details"].items():
-            print(f"{endpoint:30} | {stats['success_rate']:5.1f}% | {stats.get('avg_response_time', 0)*1000:6.1f}ms")
-        
-        if args.output:
-            with open(args.output, 'w') as f:
-                json.dump(report, f, indent=2, default=str)
-            print(f"\nDetailed results saved to: {args.output}")
-        
+        await tester.run(test_config(args))
+        print_report(tester.generate_report(), args.output)
     except KeyboardInterrupt:
         print("\nTest interrupted by user")
     except Exception as e:
         print(f"Test failed: {e}")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    args = parse_args()
+    if args.workers > 1 or args.coordinator or args.agent:
+        import load_cluster
+        load_cluster.run(args)
+    else:
+        asyncio.run(main(args))
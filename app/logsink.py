@@ -0,0 +1,198 @@
+"""
+Non-blocking Log Pipeline
+structlog events are queued on the request path and rendered and written in
+batches by a background thread, so a slow log driver never stalls the loop
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional
+
+import structlog
+from prometheus_client import Counter, Gauge
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+# Prometheus metrics
+LOG_EVENTS_WRITTEN = Counter('log_events_written_total', 'Log events written to the output stream')
+LOG_EVENTS_DROPPED = Counter('log_events_dropped_total', 'Log events discarded before writing', ['reason'])
+LOG_QUEUE_DEPTH = Gauge('log_queue_depth', 'Log events waiting for the writer thread')
+
+# Levels that are never sampled away (they can still be dropped when the queue is full)
+KEEP_LEVELS = frozenset(("warning", "error", "critical", "exception"))
+
+
+def render_json(event_dict: Dict[str, Any]) -> bytes:
+    """Render one event as a JSON line; the timestamp is formatted here, off the loop"""
+    timestamp = event_dict.get("timestamp")
+    if isinstance(timestamp, float):
+        event_dict["timestamp"] = datetime.utcfromtimestamp(timestamp).isoformat() + "Z"
+    if orjson is not None:
+        return orjson.dumps(event_dict, default=str, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(event_dict, default=str) + "\n").encode()
+
+
+def add_timestamp(logger, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Capture the time as a float; render_json formats it in the writer thread"""
+    event_dict["timestamp"] = time.time()
+    return event_dict
+
+
+class EventRateLimiter:
+    """structlog processor: token bucket per event name.
+
+    Events over ``per_second`` (with a burst of the same size) are dropped;
+    the next event of that name that gets through carries ``suppressed=N``.
+    """
+
+    def __init__(self, per_second: float, clock=time.monotonic):
+        self.per_second = per_second
+        self._clock = clock
+        self._buckets: Dict[str, list] = {}
+
+    def __call__(self, logger, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        if self.per_second <= 0:
+            return event_dict
+
+        now = self._clock()
+        event = event_dict.get("event")
+        bucket = self._buckets.get(event)
+        if bucket is None:
+            bucket = self._buckets[event] = [self.per_second, now, 0]  # tokens, updated, suppressed
+
+        tokens = min(self.per_second, bucket[0] + (now - bucket[1]) * self.per_second)
+        bucket[1] = now
+        if tokens < 1:
+            bucket[0] = tokens
+            bucket[2] += 1
+            LOG_EVENTS_DROPPED.labels(reason="rate_limited").inc()
+            raise structlog.DropEvent
+
+        bucket[0] = tokens - 1
+        if bucket[2]:
+            event_dict["suppressed"] = bucket[2]
+            bucket[2] = 0
+        return event_dict
+
+
+class LogSink:
+    """Bounded queue drained by a writer thread.
+
+    ``enqueue`` only appends to a deque. Once the queue is half full,
+    info/debug events are sampled (one in ``sample_every`` kept); when it is
+    full everything new is dropped. The writer wakes every
+    ``flush_interval`` seconds, renders up to ``batch_size`` events and
+    writes them with a single call.
+    """
+
+    def __init__(
+        self,
+        stream=None,
+        capacity: int = 10000,
+        batch_size: int = 512,
+        flush_interval: float = 0.05,
+        sample_every: int = 10
+    ):
+        self.stream = stream or getattr(sys.stdout, "buffer", sys.stdout)
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sample_every = max(1, sample_every)
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._sampled = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Threads don't survive fork; gunicorn workers start their own writer
+        os.register_at_fork(after_in_child=self._reset)
+        atexit.register(self.close)
+
+    def _reset(self) -> None:
+        self._queue = deque()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def enqueue(self, event_dict: Dict[str, Any]) -> None:
+        depth = len(self._queue)
+        if depth >= self.capacity:
+            LOG_EVENTS_DROPPED.labels(reason="full").inc()
+            return
+        if depth * 2 >= self.capacity and event_dict.get("level") not in KEEP_LEVELS:
+            self._sampled += 1
+            if self._sampled % self.sample_every:
+                LOG_EVENTS_DROPPED.labels(reason="sampled").inc()
+                return
+
+        self._queue.append(event_dict)
+        if self._thread is None:
+            self._start()
+
+    def _start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            while self.drain():
+                pass
+        while self.drain():
+            pass
+
+    def drain(self) -> int:
+        """Write one batch; returns how many events were written"""
+        queue = self._queue
+        lines = []
+        while queue and len(lines) < self.batch_size:
+            event_dict = queue.popleft()
+            try:
+                lines.append(render_json(event_dict))
+            except Exception as e:
+                lines.append(render_json({"event": "Log event could not be rendered", "error": str(e)}))
+
+        LOG_QUEUE_DEPTH.set(len(queue))
+        if not lines:
+            return 0
+        try:
+            self.stream.write(b"".join(lines))
+            self.stream.flush()
+        except Exception:
+            LOG_EVENTS_DROPPED.labels(reason="write_error").inc(len(lines))
+            return 0
+        LOG_EVENTS_WRITTEN.inc(len(lines))
+        return len(lines)
+
+    def close(self) -> None:
+        """Stop the writer and flush whatever is still queued"""
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=5)
+        while self.drain():
+            pass
+
+
+class QueueLogger:
+    """structlog logger whose methods hand the event dict to a LogSink"""
+
+    def __init__(self, sink: LogSink):
+        self._sink = sink
+
+    def msg(self, **event_dict: Any) -> None:
+        self._sink.enqueue(event_dict)
+
+    debug = info = warning = warn = error = critical = exception = fatal = log = msg
+
+
+class QueueLoggerFactory:
+    def __init__(self, sink: LogSink):
+        self._logger = QueueLogger(sink)
+
+    def __call__(self, *args: Any) -> QueueLogger:
+        return self._logger
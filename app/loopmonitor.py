@@ -0,0 +1,174 @@
+"""
+Event Loop Instrumentation
+Loop-lag histogram, a watchdog that captures the stack of whatever is
+blocking the loop, and an on-demand sampling profiler producing collapsed
+stacks for flamegraph tools
+"""
+
+import asyncio
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import Counter as StackCounter, deque
+from typing import Any, Deque, Dict, List, Optional
+
+import structlog
+from prometheus_client import Counter, Histogram
+
+logger = structlog.get_logger()
+
+# Prometheus metrics
+EVENT_LOOP_LAG = Histogram(
+    'event_loop_lag_seconds',
+    'Delay between a scheduled loop tick and when it actually ran',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+EVENT_LOOP_STALLS = Counter('event_loop_stalls_total', 'Loop stalls over the slow-callback threshold', ['coroutine'])
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _stack(frame, limit: int = 64) -> List[str]:
+    """Frame labels from the outermost call to ``frame``"""
+    labels = []
+    while frame is not None and len(labels) < limit:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def _innermost_coroutine(frame) -> Optional[str]:
+    """The deepest ``async def`` on the stack, usually the handler that blocked"""
+    while frame is not None:
+        if frame.f_code.co_flags & inspect.CO_COROUTINE:
+            return _frame_label(frame)
+        frame = frame.f_back
+    return None
+
+
+class LoopMonitor:
+    """Measures loop lag and reports what blocked the loop.
+
+    A task sleeps ``interval_seconds`` at a time and records how late it
+    woke up. A watchdog thread checks that task's heartbeat; once the loop
+    has been stuck for ``slow_callback_seconds`` it snapshots the loop
+    thread's stack and the running task. The stall is logged (with its full
+    duration) when the loop gets going again, and kept for ``/debug/stalls``.
+    """
+
+    def __init__(self, interval_seconds: float = 0.1, slow_callback_seconds: float = 0.25, keep: int = 50):
+        self.interval_seconds = interval_seconds
+        self.slow_callback_seconds = slow_callback_seconds
+        self.stalls: Deque[Dict[str, Any]] = deque(maxlen=keep)
+        self._heartbeat = time.monotonic()
+        self._pending: Optional[Dict[str, Any]] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            now = time.monotonic()
+            self._heartbeat = now
+            lag = max(0.0, now - expected)
+            EVENT_LOOP_LAG.observe(lag)
+
+            stall, self._pending = self._pending, None
+            if stall is not None:
+                stall["blocked_ms"] = round(lag * 1000, 1)
+                self.stalls.append(stall)
+                EVENT_LOOP_STALLS.labels(coroutine=stall["coroutine"]).inc()
+                logger.warning("Event loop blocked", **stall)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.slow_callback_seconds / 2):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval_seconds
+            if blocked < self.slow_callback_seconds or self._pending is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            # Read without the loop's cooperation; a plain dict lookup is safe under the GIL
+            task = asyncio.current_task(self._loop)
+            coroutine = _innermost_coroutine(frame)
+            stack = _stack(frame)
+            # Skip stalls that ended between the heartbeat read and the snapshot
+            if self._heartbeat == heartbeat:
+                self._pending = {
+                    "coroutine": coroutine or "<callback>",
+                    "task": task.get_name() if task is not None else None,
+                    "stack": stack,
+                }
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.create_task(self._run())
+        if self.slow_callback_seconds > 0:
+            self._stop = threading.Event()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+
+class SamplingProfiler:
+    """Samples every thread's stack from a background thread.
+
+    Only one profile runs at a time. Output is the collapsed-stack format
+    (``thread;outer;...;inner count`` per line) read by flamegraph.pl and
+    speedscope. Idle threads blocked in ``select``/``wait`` show up too,
+    which is what separates "loop busy" from "loop waiting on I/O".
+    """
+
+    def __init__(self, interval_seconds: float = 0.01):
+        self.interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+
+    def _sample(self, seconds: float) -> StackCounter:
+        stacks: StackCounter = StackCounter()
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    stacks[";".join([names.get(thread_id, str(thread_id)), *_stack(frame)])] += 1
+            time.sleep(self.interval_seconds)
+        return stacks
+
+    async def profile(self, seconds: float) -> str:
+        """Sample for ``seconds`` and return collapsed stacks; raises RuntimeError if already profiling"""
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        try:
+            stacks = await asyncio.to_thread(self._sample, seconds)
+        finally:
+            self._lock.release()
+        logger.info("Profile captured", seconds=seconds, samples=sum(stacks.values()), stacks=len(stacks))
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
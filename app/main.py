@@ -3,51 +3,93 @@ Enterprise E-commerce Microservice
 FastAPI-based product catalog and order management system
 """
 
-import asyncio
 import time
+
+# Everything imported below counts towards the "import" startup phase
+_import_started = time.perf_counter()
+
+import asyncio
 import uuid
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from typing import List, Optional
 
 import structlog
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Request
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, Response, HTMLResponse
-from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest, multiprocess, CONTENT_TYPE_LATEST
 from pydantic import BaseModel, Field
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import create_engine, BigInteger, Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, Index, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, selectinload
 from sqlalchemy.future import select
-from sqlalchemy.pool import QueuePool
-import psutil
 import os
-import boto3
 from functools import lru_cache
 
-# Configure structured logging
+from admission import SHED_SCOPE_KEY, AdaptiveLimiter, AdmissionMiddleware
+from bulk import BulkInserter, parse_records, validate_records
+from cache import build_cache
+from compression import CompressionMiddleware, available_encodings
+from compute import fib_iterative, fib_naive
+from etag import etag_matches, make_etag, not_modified
+from dbmetrics import TimedQueuePool
+from executor import CPUExecutor
+from group_commit import GroupCommitter
+from export import export_response
+from fastjson import FastJSONResponse, projected_columns, rows_as_dicts
+from health import HealthProber
+from loopmonitor import LoopMonitor, SamplingProfiler
+from logsink import EventRateLimiter, LogSink, QueueLoggerFactory, add_timestamp
+from resources import container_cpu_count
+from routing import READ_METHODS, DatabaseRouter
+from search import SearchIndex
+from startup import StartupTimer
+from singleflight import SingleFlight
+from pagination import NEXT_CURSOR_HEADER, apply_keyset, set_next_cursor
+from pages import RenderedPage, TemplatePage
+
+# Configure structured logging: the event loop only queues events, a writer
+# thread renders and writes them in batches (see logsink.py)
+log_sink = LogSink(
+    capacity=int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+    sample_every=int(os.getenv("LOG_SAMPLE_EVERY", "10"))
+)
 structlog.configure(
     processors=[
-        structlog.processors.TimeStamper(fmt="iso"),
+        EventRateLimiter(float(os.getenv("LOG_RATE_LIMIT", "100"))),
+        add_timestamp,
         structlog.processors.add_log_level,
         structlog.processors.StackInfoRenderer(),
         structlog.dev.set_exc_info,
-        structlog.processors.JSONRenderer()
+        # Tracebacks must be captured on the thread that raised
+        structlog.processors.format_exc_info
     ],
     wrapper_class=structlog.make_filtering_bound_logger(20),  # INFO level
-    logger_factory=structlog.PrintLoggerFactory(),
+    logger_factory=QueueLoggerFactory(log_sink),
     cache_logger_on_first_use=True,
 )
 
 logger = structlog.get_logger()
 
 # Prometheus metrics
+def _latency_buckets():
+    # Comma-separated seconds, e.g. METRICS_LATENCY_BUCKETS="0.01,0.05,0.1,0.5,1"
+    raw = os.getenv("METRICS_LATENCY_BUCKETS")
+    if not raw:
+        return Histogram.DEFAULT_BUCKETS
+    return tuple(sorted(float(bucket) for bucket in raw.split(",") if bucket.strip()))
+
+# Endpoint labels are route templates (e.g. /products/{product_id}), never raw paths
+UNMATCHED_ROUTE = "<unmatched>"
+SHED_ROUTE = "<shed>"  # rejected by admission control before routing
 REQUEST_COUNT = Counter('http_requests_total', 'Total HTTP requests', ['method', 'endpoint', 'status'])
-REQUEST_DURATION = Histogram('http_request_duration_seconds', 'HTTP request duration')
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'HTTP request duration',
+    ['method', 'endpoint'], buckets=_latency_buckets()
+)
 DB_QUERY_DURATION = Histogram('db_query_duration_seconds', 'Database query duration')
 
 # Database Models
@@ -100,6 +142,9 @@ class Product(Base):
     
     category = relationship("Category", back_populates="products")
     order_items = relationship("OrderItem", back_populates="product")
+    
+    # Supports keyset pagination when sorting by price
+    __table_args__ = (Index("ix_products_price_id", "price", "id"),)
 
 class Order(Base):
     __tablename__ = "orders"
@@ -115,6 +160,13 @@ class Order(Base):
     user = relationship("User", back_populates="orders")
     items = relationship("OrderItem", back_populates="order")
 
+class CatalogVersion(Base):
+    """Write counter per catalog, bumped after every committed change (ETags and list cache keys)"""
+    __tablename__ = "catalog_versions"
+    
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
 class OrderItem(Base):
     __tablename__ = "order_items"
     
@@ -197,89 +249,320 @@ class OrderResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class OrderItemCreate(BaseModel):
+    product_id: int
+    quantity: int = Field(..., gt=0)
+
+class OrderCreate(BaseModel):
+    user_id: Optional[int] = None
+    items: List[OrderItemCreate] = Field(..., min_length=1, max_length=100)
+
+class BulkResult(BaseModel):
+    received: int
+    inserted: int
+    conflicts: List[dict]
+    invalid: List[dict]
+    duration_ms: float
+    rows_per_second: float
+
+# Column projections for the fast serialization path (see fastjson.py)
+PRODUCT_COLUMNS = projected_columns(ProductResponse, Product)
+CONTACT_COLUMNS = projected_columns(ContactResponse, Contact)
+CATEGORY_COLUMNS = projected_columns(CategoryResponse, Category)
+
 # Configuration
 class Settings:
     def __init__(self):
-        self.database_url = self._get_database_url()
+        # DATABASE_URL overrides the MySQL settings (e.g. SQLite for local benchmarks);
+        # otherwise the URLs are built by resolve_database_urls() during startup
+        self.database_url = os.getenv("DATABASE_URL")
         self.secret_key = os.getenv("SECRET_KEY", "your-secret-key-here")
+        self.cache_backend = os.getenv("CACHE_BACKEND", "memory")  # memory, redis, none
+        self.cache_ttl_seconds = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+        self.cache_max_entries = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+        self.redis_url = os.getenv("REDIS_URL")
+        self.executor_workers = int(os.getenv("EXECUTOR_WORKERS", "0"))  # 0 = container CPU count
+        self.executor_max_queue = int(os.getenv("EXECUTOR_MAX_QUEUE", "16"))
+        self.executor_timeout_seconds = float(os.getenv("EXECUTOR_TIMEOUT_SECONDS", "30"))
+        # Opt-in: list endpoints select only response columns and encode rows directly
+        self.fast_serialization = os.getenv("FAST_SERIALIZATION", "false").lower() in ("1", "true", "yes")
+        self.bulk_chunk_size = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+        self.bulk_max_rows = int(os.getenv("BULK_MAX_ROWS", "10000"))
+        self.export_batch_size = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+        self.order_batch_max = int(os.getenv("ORDER_BATCH_MAX", "50"))  # 1 disables group commit
+        self.order_batch_wait_ms = float(os.getenv("ORDER_BATCH_WAIT_MS", "2"))
+        self.health_probe_interval_seconds = float(os.getenv("HEALTH_PROBE_INTERVAL_SECONDS", "5"))
+        # Each worker's search index picks up products created elsewhere this often (0 disables)
+        self.search_refresh_seconds = float(os.getenv("SEARCH_REFRESH_SECONDS", "30"))
+        # Read replicas: full URLs, or hosts sharing the primary's credentials
+        self.database_reader_urls = [url.strip() for url in os.getenv("DATABASE_READER_URLS", "").split(",") if url.strip()]
+        self.db_reader_hosts = [host.strip() for host in os.getenv("DB_READER_HOSTS", "").split(",") if host.strip()]
+        self.db_read_balancing = os.getenv("DB_READ_BALANCING", "round_robin")  # round_robin, least_connections
+        self.db_sticky_seconds = float(os.getenv("DB_STICKY_SECONDS", "5"))
+        self.db_replica_check_seconds = float(os.getenv("DB_REPLICA_CHECK_SECONDS", "5"))
+        # Worker processes per task (set by gunicorn.conf.py) share one connection budget per database
+        self.web_concurrency = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+        self.db_connection_budget = int(os.getenv("DB_CONNECTION_BUDGET", "50"))
+        # Cold start: Parameter Store deadline, and whether startup runs create_all
+        self.ssm_timeout_seconds = float(os.getenv("SSM_TIMEOUT_SECONDS", "3"))
+        self.db_create_schema = os.getenv("DB_CREATE_SCHEMA", "true").lower() in ("1", "true", "yes")
+        # Pre-rendered HTML pages: browser/CDN cache lifetime and compiled-template cache
+        self.page_max_age_seconds = int(os.getenv("PAGE_MAX_AGE_SECONDS", "60"))
+        self.jinja_bytecode_cache_dir = os.getenv("JINJA_BYTECODE_CACHE_DIR", "/tmp/jinja-bytecode")
+        # Response compression: encodings in server preference order, size floor, compressed-body LRU
+        self.compression_encodings = [name.strip() for name in os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",") if name.strip()]
+        self.compression_min_size = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+        self.compression_cache_entries = int(os.getenv("COMPRESSION_CACHE_ENTRIES", "256"))
+        # Event loop instrumentation; the /debug endpoints are opt-in
+        self.loop_monitor_interval_seconds = float(os.getenv("LOOP_MONITOR_INTERVAL_SECONDS", "0.1"))
+        self.slow_callback_seconds = float(os.getenv("SLOW_CALLBACK_SECONDS", "0.25"))
+        self.debug_endpoints = os.getenv("DEBUG_ENDPOINTS", "false").lower() in ("1", "true", "yes")
+        self.profile_max_seconds = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+        # Statements at least this slow are logged with their fingerprint and parameter types
+        self.slow_query_seconds = float(os.getenv("SLOW_QUERY_SECONDS", "0.5"))
+        # Admission control: adaptive in-flight limit per worker; critical paths are never shed
+        self.admission_control = os.getenv("ADMISSION_CONTROL", "true").lower() in ("1", "true", "yes")
+        self.admission_initial_limit = float(os.getenv("ADMISSION_INITIAL_LIMIT", "50"))
+        self.admission_min_limit = float(os.getenv("ADMISSION_MIN_LIMIT", "5"))
+        self.admission_max_limit = float(os.getenv("ADMISSION_MAX_LIMIT", "500"))
+        self.admission_target_latency_ms = float(os.getenv("ADMISSION_TARGET_LATENCY_MS", "250"))
+        self.admission_read_share = float(os.getenv("ADMISSION_READ_SHARE", "0.8"))
+        self.admission_critical_paths = [path.strip() for path in os.getenv("ADMISSION_CRITICAL_PATHS", "/health,/health/simple,/metrics,/debug/profile").split(",") if path.strip()]
+        # Slow by design: admitted and counted, but their latency doesn't cut the limit
+        self.admission_unmeasured_paths = [path.strip() for path in os.getenv("ADMISSION_UNMEASURED_PATHS", "/compute/,/products/bulk,/contacts/bulk,/export/,/debug/").split(",") if path.strip()]
+        self.admission_retry_after_seconds = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
         
-    def _get_database_url(self):
+    async def resolve_database_urls(self):
+        """Build the MySQL URLs, fetching the password only if some URL needs it"""
+        if self.database_url and (self.database_reader_urls or not self.db_reader_hosts):
+            return
+        password = await self._get_db_password()
+        if not self.database_url:
+            self.database_url = self._get_database_url(password)
+        if not self.database_reader_urls:
+            self.database_reader_urls = [self._get_database_url(password, host) for host in self.db_reader_hosts]
+    
+    def _get_database_url(self, password, host=None):
         # For MySQL to match the infrastructure
-        host = os.getenv("DB_HOST", "localhost")
+        host = host or os.getenv("DB_HOST", "localhost")
         user = os.getenv("DB_USER", "tfplayground_user")
-        password = self._get_db_password()
         database = os.getenv("DB_NAME", "tfplayground")
         
         return f"mysql+aiomysql://{user}:{password}@{host}:3306/{database}"
     
-    @lru_cache(maxsize=1)
-    def _get_db_password(self):
+    async def _get_db_password(self):
         # For local development, use environment variable
         if os.environ.get('DB_PASSWORD'):
             return os.environ.get('DB_PASSWORD')
         
-        # For AWS deployment, use Parameter Store
+        # For AWS deployment, use Parameter Store; boto3 blocks, so it runs in a thread with a deadline
         try:
-            region = os.environ.get('AWS_REGION', 'us-east-2')
-            client = boto3.client('ssm', region_name=region)
-            parameter_name = '/tf-playground/all/db-password'
-            response = client.get_parameter(
-                Name=parameter_name,
-                WithDecryption=True
-            )
-            return response['Parameter']['Value']
+            return await asyncio.wait_for(asyncio.to_thread(self._fetch_ssm_password), timeout=self.ssm_timeout_seconds)
         except Exception as e:
-            logger.error("Failed to get password from Parameter Store", error=str(e))
+            logger.error("Failed to get password from Parameter Store", error=str(e) or type(e).__name__)
             return "defaultpassword"
+    
+    def _fetch_ssm_password(self):
+        # Imported here: boto3 adds ~100ms to every cold start that doesn't need it
+        import boto3
+        from botocore.config import Config
+        
+        region = os.environ.get('AWS_REGION', 'us-east-2')
+        client = boto3.client(
+            'ssm',
+            region_name=region,
+            config=Config(connect_timeout=self.ssm_timeout_seconds, read_timeout=self.ssm_timeout_seconds, retries={"max_attempts": 2})
+        )
+        parameter_name = '/tf-playground/all/db-password'
+        response = client.get_parameter(
+            Name=parameter_name,
+            WithDecryption=True
+        )
+        return response['Parameter']['Value']
 
 settings = Settings()
+startup_timer = StartupTimer()
 
 # Database setup
-engine = create_async_engine(
-    settings.database_url,
-    poolclass=QueuePool,
-    pool_size=20,
-    max_overflow=30,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    echo=False
+def pool_limits(budget: int, workers: int):
+    """Split a per-database connection budget into per-worker pool_size/max_overflow"""
+    per_worker = max(2, budget // workers)
+    pool_size = max(1, per_worker * 2 // 5)  # 50 for one worker keeps the original 20 + 30
+    return pool_size, per_worker - pool_size
+
+def create_database() -> DatabaseRouter:
+    """Create the engines; called from lifespan so each worker process owns its pools"""
+    pool_size, max_overflow = pool_limits(settings.db_connection_budget, settings.web_concurrency)
+    engine_options = dict(
+        # asyncio-aware QueuePool (a full sync QueuePool would block the loop while waiting)
+        poolclass=TimedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        echo=False
+    )
+    
+    # GET handlers read from replicas (when configured); everything else uses the primary
+    return DatabaseRouter(
+        create_async_engine(settings.database_url, **engine_options),
+        [create_async_engine(url, **engine_options) for url in settings.database_reader_urls],
+        balancing=settings.db_read_balancing,
+        sticky_seconds=settings.db_sticky_seconds,
+        check_interval_seconds=settings.db_replica_check_seconds,
+        slow_query_seconds=settings.slow_query_seconds
+    )
+
+# Set per worker at startup
+database: Optional[DatabaseRouter] = None
+engine = None
+AsyncSessionLocal = None
+
+# Catalog cache in front of product reads. The in-process backend can't see
+# other workers' invalidations, so with several workers only Redis is shared
+cache_backend = settings.cache_backend
+if cache_backend != "none" and settings.web_concurrency > 1 and not (cache_backend == "redis" and settings.redis_url):
+    logger.warning(
+        "Catalog cache disabled: several workers need CACHE_BACKEND=redis and REDIS_URL",
+        backend=cache_backend, workers=settings.web_concurrency
+    )
+    cache_backend = "none"
+catalog_cache = build_cache(
+    cache_backend,
+    max_entries=settings.cache_max_entries,
+    ttl_seconds=settings.cache_ttl_seconds,
+    redis_url=settings.redis_url,
+    # Replicas may still serve pre-write rows until the writer's sticky window ends
+    replica_quiet_seconds=settings.db_sticky_seconds if settings.database_reader_urls or settings.db_reader_hosts else 0
+)
+
+# Identical concurrent catalog reads share one DB call
+catalog_flight = SingleFlight("catalog")
+
+# Process pool for CPU-bound endpoints
+cpu_executor = CPUExecutor(
+    # By default the container's CPUs are shared between web workers
+    max_workers=settings.executor_workers or max(1, container_cpu_count() // settings.web_concurrency),
+    max_queue=settings.executor_max_queue,
+    timeout=settings.executor_timeout_seconds
 )
 
-AsyncSessionLocal = async_sessionmaker(
-    engine, 
-    class_=AsyncSession, 
-    expire_on_commit=False
+# Background dependency checks served by /health
+health_prober = HealthProber(
+    session_factory=lambda: AsyncSessionLocal(),
+    interval_seconds=settings.health_probe_interval_seconds,
+    db_latency_histogram=DB_QUERY_DURATION
+)
+
+# Loop-lag histogram and blocked-loop stack capture; sampling profiler for /debug/profile
+loop_monitor = LoopMonitor(
+    interval_seconds=settings.loop_monitor_interval_seconds,
+    slow_callback_seconds=settings.slow_callback_seconds
+)
+profiler = SamplingProfiler()
+
+# In-process product search, built at startup and updated on create
+search_index = SearchIndex()
+
+# Orders are group-committed so a hot SKU's row lock is taken once per batch
+async def lock_products(session: AsyncSession, product_ids: List[int]):
+    """Take row locks in ascending id order (a no-op on SQLite)"""
+    if product_ids:
+        await session.execute(
+            select(Product.id).where(Product.id.in_(product_ids)).order_by(Product.id).with_for_update()
+        )
+
+order_committer = GroupCommitter(
+    "orders",
+    session_factory=lambda: AsyncSessionLocal(),
+    lock_rows=lock_products,
+    max_batch=settings.order_batch_max,
+    max_wait_seconds=settings.order_batch_wait_ms / 1000
 )
 
 # Dependency to get database session
-async def get_db():
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+async def get_db(request: Request):
+    async with database.session(request) as session:
+        yield session
+
+async def catalog_read(request: Request, namespace: str, key, loader):
+    """Cached, single-flighted catalog read for plain replica-routed GETs.
+    
+    Sticky, write and fallback routes go straight to their session: a client
+    that just wrote must see its own write, not a cache entry or a flight
+    filled from a lagging replica.
+    """
+    pool, reason = request.state.db_route
+    if reason != "read":
+        return await loader()
+    return await catalog_cache.get_or_load(
+        namespace,
+        key,
+        lambda: catalog_flight.do((namespace, key), loader),
+        from_replica=pool is not database.primary
+    )
 
 # Application lifecycle
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    logger.info("Starting up application")
+    global database, engine, AsyncSessionLocal
+    logger.info("Starting up application", pid=os.getpid())
     
-    # Create tables (in production, use Alembic migrations)
-    try:
-        async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-        logger.info("Database tables created successfully")
-    except Exception as e:
-        logger.warning("Failed to create database tables", error=str(e))
-        logger.info("Application will start without database initialization")
+    # The Parameter Store lookup runs while the executor comes up
+    with startup_timer.phase("config"):
+        resolving = asyncio.create_task(settings.resolve_database_urls())
+        cpu_executor.start()
+        await resolving
+    
+    with startup_timer.phase("db_connect"):
+        database = create_database()
+        engine = database.primary.engine
+        AsyncSessionLocal = database.primary.sessions
+        
+        if settings.db_create_schema:
+            # Create tables (in production, use Alembic migrations)
+            try:
+                async with engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+                logger.info("Database tables created successfully")
+            except Exception as e:
+                logger.warning("Failed to create database tables", error=str(e))
+                logger.info("Application will start without database initialization")
+        else:
+            # Still open the first connection so the pool is warm for the first request
+            try:
+                async with engine.connect():
+                    pass
+            except Exception as e:
+                logger.warning("Failed to connect to database", error=str(e))
+    
+    with startup_timer.phase("services"):
+        loop_monitor.start()
+        await database.start()
+        await health_prober.start()
+        order_committer.start()
+        search_build = asyncio.create_task(build_search_index())
+        search_refresh = (
+            asyncio.create_task(refresh_search_index(settings.search_refresh_seconds))
+            if settings.search_refresh_seconds > 0 else None
+        )
     
-    logger.info("Application startup complete")
+    logger.info("Application startup complete", **startup_timer.report())
     yield
     
     # Shutdown
     logger.info("Shutting down application")
-    await engine.dispose()
+    search_build.cancel()
+    if search_refresh is not None:
+        search_refresh.cancel()
+    await health_prober.stop()
+    await order_committer.stop()
+    cpu_executor.shutdown()
+    await catalog_cache.close()
+    await database.stop()
+    await database.dispose()
+    await loop_monitor.stop()
 
 # FastAPI app
 app = FastAPI(
@@ -289,8 +572,17 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Jinja2 templates setup
-templates = Jinja2Templates(directory="templates")
+# Jinja2 templates setup (loaded on first use so cold starts skip jinja2)
+@lru_cache(maxsize=1)
+def get_templates():
+    from fastapi.templating import Jinja2Templates
+    from jinja2 import FileSystemBytecodeCache
+    
+    os.makedirs(settings.jinja_bytecode_cache_dir, exist_ok=True)
+    return Jinja2Templates(
+        directory="templates",
+        bytecode_cache=FileSystemBytecodeCache(settings.jinja_bytecode_cache_dir)
+    )
 
 # Middleware
 app.add_middleware(
@@ -299,54 +591,88 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
+)
+compression_encodings = available_encodings(settings.compression_encodings)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_min_size,
+    encodings=compression_encodings,
+    cache_entries=settings.compression_cache_entries,
+)
+# Shed excess load with a fast 503 before it queues on the connection pool
+admission_limiter = AdaptiveLimiter(
+    initial_limit=settings.admission_initial_limit,
+    min_limit=settings.admission_min_limit,
+    max_limit=settings.admission_max_limit,
+    target_latency=settings.admission_target_latency_ms / 1000,
+    read_share=settings.admission_read_share
 )
+if settings.admission_control:
+    app.add_middleware(
+        AdmissionMiddleware,
+        limiter=admission_limiter,
+        critical_paths=settings.admission_critical_paths,
+        unmeasured_prefixes=settings.admission_unmeasured_paths,
+        retry_after_seconds=settings.admission_retry_after_seconds,
+    )
 
 @app.middleware("http")
 async def metrics_middleware(request: Request, call_next):
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     response = await call_next(request)
     
-    duration = time.time() - start_time
-    REQUEST_DURATION.observe(duration)
+    duration = time.perf_counter() - start_time
+    # The router stores the matched route in the shared scope; unmatched paths
+    # (404 scans, typos) collapse into one series so cardinality stays bounded
+    route = request.scope.get("route")
+    if route is None and request.scope.get(SHED_SCOPE_KEY):
+        endpoint = SHED_ROUTE
+    else:
+        endpoint = getattr(route, "path", UNMATCHED_ROUTE)
+    REQUEST_DURATION.labels(method=request.method, endpoint=endpoint).observe(duration)
+    if not startup_timer.first_request_done:
+        startup_timer.first_request(duration)
     REQUEST_COUNT.labels(
         method=request.method,
-        endpoint=request.url.path,
+        endpoint=endpoint,
         status=response.status_code
     ).inc()
     
     return response
 
+@app.middleware("http")
+async def read_your_writes_middleware(request: Request, call_next):
+    response = await call_next(request)
+    # A client that just wrote reads from the primary until replicas catch up
+    if request.method not in READ_METHODS and response.status_code < 400:
+        database.mark_write(response)
+    return response
+
 # Health check endpoints
 @app.get("/health")
 async def health_check():
-    """Comprehensive health check"""
-    try:
-        # Database check
-        async with AsyncSessionLocal() as session:
-            start_time = time.time()
-            await session.execute(select(1))
-            db_duration = time.time() - start_time
-            DB_QUERY_DURATION.observe(db_duration)
-        
-        # System resources
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
-        return {
-            "status": "healthy",
-            "timestamp": datetime.utcnow().isoformat(),
-            "container_id": os.environ.get('HOSTNAME', 'unknown'),
-            "deployment_color": os.environ.get('DEPLOYMENT_COLOR', 'unknown'),
-            "checks": {
-                "database": {"status": "ok", "response_time_ms": round(db_duration * 1000, 2)},
-                "memory_usage": {"percent": memory.percent, "available_gb": round(memory.available / 1024**3, 2)},
-                "disk_usage": {"percent": disk.percent, "free_gb": round(disk.free / 1024**3, 2)}
-            }
-        }
-    except Exception as e:
-        logger.error("Health check failed", error=str(e))
-        raise HTTPException(status_code=503, detail=f"Health check failed: {str(e)}")
+    """Comprehensive health check, served from the background prober's snapshot"""
+    report = health_prober.report()
+    
+    if not report["healthy"]:
+        db_check = report["checks"].get("database", {})
+        reason = db_check.get("error") or f"snapshot stale ({report['staleness_seconds']}s)"
+        logger.error("Health check failed", error=reason)
+        raise HTTPException(status_code=503, detail=f"Health check failed: {reason}")
+    
+    return {
+        "status": "healthy",
+        "timestamp": datetime.utcnow().isoformat(),
+        "checked_at": report["checked_at"],
+        "staleness_seconds": report["staleness_seconds"],
+        "container_id": os.environ.get('HOSTNAME', 'unknown'),
+        "deployment_color": os.environ.get('DEPLOYMENT_COLOR', 'unknown'),
+        "checks": report["checks"],
+        "database_pools": database.report(),
+        "admission": admission_limiter.report()
+    }
 
 @app.get("/health/simple")
 async def simple_health_check():
@@ -360,8 +686,39 @@ async def simple_health_check():
 @app.get("/metrics")
 async def metrics():
     """Prometheus metrics endpoint"""
+    # Under gunicorn every worker writes to PROMETHEUS_MULTIPROC_DIR; aggregate them all
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
     return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
+# Debug endpoints (DEBUG_ENDPOINTS=true); each worker reports on itself
+def require_debug_endpoints():
+    if not settings.debug_endpoints:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+@app.get("/debug/profile", response_class=PlainTextResponse, dependencies=[Depends(require_debug_endpoints)])
+async def debug_profile(seconds: float = Query(10, gt=0)):
+    """Sample this worker's threads and return collapsed stacks (flamegraph.pl / speedscope)"""
+    if seconds > settings.profile_max_seconds:
+        raise HTTPException(status_code=400, detail=f"seconds must be at most {settings.profile_max_seconds:g}")
+    try:
+        stacks = await profiler.profile(seconds)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(stacks, headers={"Content-Disposition": f"attachment; filename=profile-{os.getpid()}.folded"})
+
+@app.get("/debug/stalls", dependencies=[Depends(require_debug_endpoints)])
+async def debug_stalls():
+    """Recent event loop stalls with the coroutine and stack that caused them"""
+    return {"pid": os.getpid(), "stalls": list(loop_monitor.stalls)}
+
+@app.get("/debug/queries", dependencies=[Depends(require_debug_endpoints)])
+async def debug_queries(top: int = Query(20, ge=1, le=200)):
+    """Statements with the most total time in this worker, by fingerprint"""
+    return {"pid": os.getpid(), "pools": database.report(), "statements": database.statement_report(top)}
+
 # API Routes
 @app.get("/", response_model=dict)
 async def root():
@@ -374,10 +731,8 @@ async def root():
         "deployment_color": os.environ.get('DEPLOYMENT_COLOR', 'unknown')
     }
 
-@app.get("/web")
-async def web_root():
-    """Hello World HTML page"""
-    html_content = """
+# HTML pages are rendered once per process and served as pre-compressed bytes
+WEB_PAGE_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -423,20 +778,24 @@ async def web_root():
     </body>
     </html>
     """
-    
-    return HTMLResponse(content=html_content)
+
+web_page = RenderedPage(WEB_PAGE_HTML.encode())
+jinja_page = TemplatePage("index.html", lambda: get_templates().env, {
+    "service": "Enterprise E-commerce API",
+    "version": "1.0.0",
+    "container_id": os.environ.get('HOSTNAME', 'unknown'),
+    "deployment_color": os.environ.get('DEPLOYMENT_COLOR', 'unknown')
+})
+
+@app.get("/web")
+async def web_root(request: Request):
+    """Hello World HTML page"""
+    return web_page.response(request, settings.page_max_age_seconds, compression_encodings)
 
 @app.get("/jinja")
 async def jinja_root(request: Request):
-    """Hello World with Jinja2 template"""
-    return templates.TemplateResponse("index.html", {
-        "request": request,
-        "service": "Enterprise E-commerce API",
-        "version": "1.0.0",
-        "container_id": os.environ.get('HOSTNAME', 'unknown'),
-        "deployment_color": os.environ.get('DEPLOYMENT_COLOR', 'unknown'),
-        "timestamp": datetime.utcnow().isoformat()
-    })
+    """Hello World with Jinja2 template (timestamp refreshed once per second)"""
+    return jinja_page.current().response(request, settings.page_max_age_seconds, compression_encodings)
 
 
 
@@ -445,17 +804,28 @@ async def jinja_root(request: Request):
 # Contacts
 @app.get("/contacts", response_model=List[ContactResponse])
 async def get_contacts(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all contacts with pagination"""
-    result = await db.execute(
-        select(Contact).offset(skip).limit(limit)
-    )
-    contacts = result.scalars().all()
+    """Get all contacts with pagination (pass X-Next-Cursor back as cursor to page)"""
+    if settings.fast_serialization:
+        result = await db.execute(
+            apply_keyset(select(*CONTACT_COLUMNS), Contact, cursor, skip).limit(limit)
+        )
+        contacts = rows_as_dicts(ContactResponse, result.all())
+    else:
+        result = await db.execute(
+            apply_keyset(select(Contact), Contact, cursor, skip).limit(limit)
+        )
+        contacts = result.scalars().all()
+    set_next_cursor(response, contacts, limit)
     
     logger.info("Contacts retrieved from database", count=len(contacts))
+    if settings.fast_serialization:
+        return FastJSONResponse(contacts, headers=dict(response.headers))
     return contacts
 
 @app.post("/contacts", response_model=ContactResponse)
@@ -472,6 +842,16 @@ async def create_contact(
     logger.info("Contact created", contact_id=db_contact.id, name=db_contact.name)
     return db_contact
 
+@app.post("/contacts/bulk", response_model=BulkResult)
+async def create_contacts_bulk(
+    request: Request,
+    chunk_size: int = Query(None, ge=1, le=5000),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create many contacts from a JSON array or NDJSON body; duplicate emails are reported per row"""
+    result, _ = await _bulk_ingest(request, ContactCreate, BulkInserter(Contact, "email", chunk_size or settings.bulk_chunk_size), db)
+    return result
+
 @app.get("/contacts/{contact_id}", response_model=ContactResponse)
 async def get_contact(contact_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific contact by ID"""
@@ -485,6 +865,104 @@ async def get_contact(contact_id: int, db: AsyncSession = Depends(get_db)):
     
     return contact
 
+# Catalog versions
+async def read_catalog_version(db: AsyncSession, name: str) -> int:
+    """Current version of a catalog (a primary-key lookup; 0 before the first write)"""
+    return await db.scalar(select(CatalogVersion.version).where(CatalogVersion.name == name)) or 0
+
+async def bump_catalog_version(*names: str):
+    """Advance catalog versions after a write has committed.
+    
+    Runs in its own short transaction so the hot version row is never locked
+    for the length of a write. Bumping after the commit means a reader can
+    briefly pair the old version with new rows, which only costs that client
+    one extra refetch later, never a stale 304.
+    """
+    try:
+        async with AsyncSessionLocal() as session:
+            for name in names:
+                result = await session.execute(
+                    update(CatalogVersion)
+                    .where(CatalogVersion.name == name)
+                    .values(version=CatalogVersion.version + 1)
+                )
+                if result.rowcount == 0:
+                    session.add(CatalogVersion(name=name, version=1))
+            await session.commit()
+    except IntegrityError:
+        # Another worker inserted the row first; its bump covers this write too
+        pass
+    except Exception as e:
+        logger.error("Catalog version bump failed", names=names, error=str(e))
+    await catalog_cache.invalidate(*names)
+
+# Orders
+async def reserve_and_create_order(session: AsyncSession, order: OrderCreate) -> Order:
+    """Decrement stock for every line and insert the order; runs inside a savepoint"""
+    if order.user_id is not None:
+        user = await session.scalar(select(User.id).where(User.id == order.user_id))
+        if user is None:
+            raise HTTPException(status_code=404, detail=f"User {order.user_id} not found")
+    
+    quantities = {}
+    for item in order.items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    
+    # Deterministic order keeps lock acquisition consistent with lock_products
+    for product_id in sorted(quantities):
+        result = await session.execute(
+            update(Product)
+            .where(
+                Product.id == product_id,
+                Product.is_active == True,
+                Product.stock_quantity >= quantities[product_id]
+            )
+            .values(stock_quantity=Product.stock_quantity - quantities[product_id])
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            exists = await session.scalar(select(Product.id).where(Product.id == product_id, Product.is_active == True))
+            if exists is None:
+                raise HTTPException(status_code=404, detail=f"Product {product_id} not found")
+            raise HTTPException(status_code=409, detail=f"Insufficient stock for product {product_id}")
+    
+    # Prices are read under the row locks taken above, so the total matches what was reserved
+    result = await session.execute(select(Product.id, Product.price).where(Product.id.in_(list(quantities))))
+    prices = dict(result.all())
+    
+    db_order = Order(
+        user_id=order.user_id,
+        order_number=f"ORD-{uuid.uuid4().hex[:16].upper()}",
+        total_amount=round(sum(prices[item.product_id] * item.quantity for item in order.items), 2),
+        items=[
+            OrderItem(product_id=item.product_id, quantity=item.quantity, unit_price=prices[item.product_id])
+            for item in order.items
+        ]
+    )
+    session.add(db_order)
+    await session.flush()
+    return db_order
+
+@app.post("/orders", response_model=OrderResponse)
+async def create_order(order: OrderCreate):
+    """Place an order, atomically reserving stock for all line items"""
+    product_ids = {item.product_id for item in order.items}
+    try:
+        db_order = await order_committer.submit(
+            lambda session: reserve_and_create_order(session, order),
+            lock_keys=product_ids
+        )
+    except IntegrityError as e:
+        logger.warning("Order rejected by a database constraint", error=str(e.orig))
+        raise HTTPException(status_code=409, detail="Order conflicts with existing data")
+    
+    # Stock changed, so cached product reads are stale
+    await catalog_cache.delete("product", *product_ids)
+    await bump_catalog_version("products")
+    
+    logger.info("Order created", order_id=db_order.id, order_number=db_order.order_number, total_amount=db_order.total_amount)
+    return db_order
+
 # Categories
 @app.post("/categories", response_model=CategoryResponse)
 async def create_category(
@@ -496,23 +974,42 @@ async def create_category(
     db.add(db_category)
     await db.commit()
     await db.refresh(db_category)
+    await bump_catalog_version("categories")
     
     logger.info("Category created", category_id=db_category.id, name=db_category.name)
     return db_category
 
 @app.get("/categories", response_model=List[CategoryResponse])
 async def get_categories(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all categories with pagination"""
-    result = await db.execute(
-        select(Category).offset(skip).limit(limit)
-    )
-    categories = result.scalars().all()
+    """Get all categories with pagination (pass X-Next-Cursor back as cursor to page)"""
+    version = await read_catalog_version(db, "categories")
+    etag = make_etag("categories", skip, limit, cursor, version)
+    if etag_matches(request, etag):
+        return not_modified(etag, "/categories")
+    response.headers["ETag"] = etag
+    
+    if settings.fast_serialization:
+        result = await db.execute(
+            apply_keyset(select(*CATEGORY_COLUMNS), Category, cursor, skip).limit(limit)
+        )
+        categories = rows_as_dicts(CategoryResponse, result.all())
+    else:
+        result = await db.execute(
+            apply_keyset(select(Category), Category, cursor, skip).limit(limit)
+        )
+        categories = result.scalars().all()
+    set_next_cursor(response, categories, limit)
     
     logger.info("Categories retrieved from database", count=len(categories))
+    if settings.fast_serialization:
+        return FastJSONResponse(categories, headers=dict(response.headers))
     return categories
 
 # Products
@@ -527,86 +1024,277 @@ async def create_product(
     db.add(db_product)
     await db.commit()
     await db.refresh(db_product)
+    await bump_catalog_version("products")
     
     # Add background task to update search index
-    background_tasks.add_task(update_search_index, db_product.id)
+    background_tasks.add_task(
+        update_search_index, db_product.id, db_product.name, db_product.description, db_product.sku
+    )
     
     logger.info("Product created", product_id=db_product.id, sku=db_product.sku)
     return db_product
 
+@app.post("/products/bulk", response_model=BulkResult)
+async def create_products_bulk(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    chunk_size: int = Query(None, ge=1, le=5000),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create many products from a JSON array or NDJSON body; duplicate SKUs are reported per row"""
+    result, skus = await _bulk_ingest(request, ProductCreate, BulkInserter(Product, "sku", chunk_size or settings.bulk_chunk_size), db)
+    if skus:
+        await bump_catalog_version("products")
+        background_tasks.add_task(index_products_by_sku, skus)
+    return result
+
 @app.get("/products", response_model=List[ProductResponse])
 async def get_products(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     category_id: Optional[int] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
+    cursor: Optional[str] = None,
+    sort: str = Query("id", pattern="^(id|price)$"),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get products with filtering and pagination"""
-    query = select(Product).options(selectinload(Product.category))
-    
+    """Get products with filtering and pagination (pass X-Next-Cursor back as cursor to page)"""
+    # Normalize the filters the same way the query treats them (falsy == unset)
+    cache_key = (category_id or None, min_price or None, max_price or None, skip, limit, cursor, sort)
+    filters = [Product.is_active == True]
     if category_id:
-        query = query.where(Product.category_id == category_id)
+        filters.append(Product.category_id == category_id)
     if min_price:
-        query = query.where(Product.price >= min_price)
+        filters.append(Product.price >= min_price)
     if max_price:
-        query = query.where(Product.price <= max_price)
+        filters.append(Product.price <= max_price)
     
-    query = query.where(Product.is_active == True).offset(skip).limit(limit)
+    # Every product write bumps this shared counter, so it is the same on every
+    # worker; a matching tag skips the page query entirely
+    version = await read_catalog_version(db, "products")
+    etag = make_etag("products", *cache_key, version)
+    if etag_matches(request, etag):
+        return not_modified(etag, "/products")
+    response.headers["ETag"] = etag
     
-    result = await db.execute(query)
-    products = result.scalars().all()
+    async def load_products():
+        if settings.fast_serialization:
+            query = select(*PRODUCT_COLUMNS)
+        else:
+            query = select(Product).options(selectinload(Product.category))
+        
+        query = query.where(*filters)
+        query = apply_keyset(query, Product, cursor, skip, sort).limit(limit)
+        
+        result = await db.execute(query)
+        if settings.fast_serialization:
+            return rows_as_dicts(ProductResponse, result.all())
+        return [
+            ProductResponse.model_validate(product).model_dump(mode="json")
+            for product in result.scalars().all()
+        ]
+    
+    # Keyed by version too, so a write on any worker makes every worker miss
+    page_key = cache_key + (version,)
+    products = await catalog_read(request, "products", page_key, load_products)
+    set_next_cursor(response, products, limit, sort)
     
     logger.info("Products retrieved", count=len(products), filters={
         "category_id": category_id,
         "min_price": min_price,
         "max_price": max_price
     })
+    if settings.fast_serialization:
+        return FastJSONResponse(products, headers=dict(response.headers))
     return products
 
-@app.get("/products/{product_id}", response_model=ProductResponse)
-async def get_product(product_id: int, db: AsyncSession = Depends(get_db)):
-    """Get a specific product by ID"""
+@app.get("/products/search", response_model=List[ProductResponse])
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """Ranked product search over name, SKU and description (last word matches as a prefix)"""
+    if not search_index.ready:
+        raise HTTPException(status_code=503, detail="Search index is still building", headers={"Retry-After": "5"})
+    
+    ranked = search_index.search(q, limit)
+    if not ranked:
+        return []
+    
     result = await db.execute(
-        select(Product).where(Product.id == product_id)
+        select(Product).where(Product.id.in_([product_id for product_id, _ in ranked]), Product.is_active == True)
     )
-    product = result.scalar_one_or_none()
+    by_id = {product.id: product for product in result.scalars().all()}
+    products = [by_id[product_id] for product_id, _ in ranked if product_id in by_id]
+    
+    logger.info("Products searched", query=q, count=len(products))
+    return products
+
+@app.get("/products/{product_id}", response_model=ProductResponse)
+async def get_product(product_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    """Get a specific product by ID"""
+    async def load_product():
+        result = await db.execute(
+            select(Product).where(Product.id == product_id)
+        )
+        product = result.scalar_one_or_none()
+        if not product:
+            return None
+        return ProductResponse.model_validate(product).model_dump(mode="json")
+    
+    product = await catalog_read(request, "product", product_id, load_product)
     
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
+    # One row is cheap to fingerprint whole, which also covers same-second stock changes
+    etag = make_etag("product", *product.values())
+    if etag_matches(request, etag):
+        return not_modified(etag, "/products/{product_id}")
+    response.headers["ETag"] = etag
     return product
 
-# Background task example
-async def update_search_index(product_id: int):
-    """Simulate updating a search index in the background"""
-    await asyncio.sleep(2)  # Simulate work
+# Streaming exports
+EXPORT_FORMAT = Query("ndjson", alias="format", pattern="^(ndjson|csv)$")
+
+@app.get("/export/products")
+async def export_products(fmt: str = EXPORT_FORMAT):
+    """Stream the full product catalog as NDJSON or CSV"""
+    query = select(Product).order_by(Product.id)
+    return export_response(database.reader_session, query, ProductResponse, fmt, "products", settings.export_batch_size)
+
+@app.get("/export/orders")
+async def export_orders(fmt: str = EXPORT_FORMAT):
+    """Stream the full order history (with line items) as NDJSON or CSV"""
+    query = select(Order).options(selectinload(Order.items)).order_by(Order.id)
+    return export_response(database.reader_session, query, OrderResponse, fmt, "orders", settings.export_batch_size)
+
+@app.get("/export/contacts")
+async def export_contacts(fmt: str = EXPORT_FORMAT):
+    """Stream all contacts as NDJSON or CSV"""
+    query = select(Contact).order_by(Contact.id)
+    return export_response(database.reader_session, query, ContactResponse, fmt, "contacts", settings.export_batch_size)
+
+# Bulk ingestion shared by the /bulk endpoints
+async def _bulk_ingest(request: Request, schema, inserter: BulkInserter, db: AsyncSession):
+    start_time = time.perf_counter()
+    
+    records = parse_records(await request.body(), request.headers.get("content-type", ""), settings.bulk_max_rows)
+    valid, invalid = validate_records(records, schema)
+    inserted_keys, conflicts = await inserter.run(db, valid)
+    inserted = len(inserted_keys)
+    
+    duration = time.perf_counter() - start_time
+    rows_per_second = round(len(records) / duration, 1) if duration > 0 else 0.0
+    logger.info(
+        "Bulk ingest completed", entity=inserter.model.__tablename__, received=len(records),
+        inserted=inserted, conflicts=len(conflicts), invalid=len(invalid), rows_per_second=rows_per_second
+    )
+    return BulkResult(
+        received=len(records),
+        inserted=inserted,
+        conflicts=conflicts,
+        invalid=invalid,
+        duration_ms=round(duration * 1000, 2),
+        rows_per_second=rows_per_second
+    ), inserted_keys
+
+# Search index maintenance
+SEARCH_COLUMNS = (Product.id, Product.name, Product.description, Product.sku)
+SEARCH_REFRESH_OVERLAP = 1000  # ids below the highest indexed one that refreshes re-read
+
+async def build_search_index():
+    """Index every active product, streaming rows so memory stays bounded"""
+    start_time = time.perf_counter()
+    try:
+        async with database.reader_session() as session:
+            result = await session.stream(
+                select(*SEARCH_COLUMNS).where(Product.is_active == True).order_by(Product.id)
+                .execution_options(yield_per=5000)
+            )
+            async for partition in result.partitions():
+                search_index.add_many(partition)
+    except Exception as e:
+        logger.warning("Failed to build search index", error=str(e))
+    search_index.ready = True
+    logger.info(
+        "Search index built", documents=search_index.documents,
+        duration_ms=round((time.perf_counter() - start_time) * 1000, 2)
+    )
+
+async def refresh_search_index(interval: float):
+    """Index products created by other workers or tasks since the last pass.
+    
+    Rescans a window below the highest indexed id, since auto-increment ids
+    can commit out of order; already-indexed products are skipped.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        if not search_index.ready:
+            continue
+        since = max(0, search_index.last_indexed - SEARCH_REFRESH_OVERLAP)
+        try:
+            async with database.reader_session() as session:
+                result = await session.stream(
+                    select(*SEARCH_COLUMNS).where(Product.is_active == True, Product.id > since)
+                    .order_by(Product.id).execution_options(yield_per=5000)
+                )
+                async for partition in result.partitions():
+                    search_index.add_many(partition)
+        except Exception as e:
+            logger.warning("Failed to refresh search index", error=str(e))
+
+async def update_search_index(product_id: int, name: str, description: Optional[str], sku: str):
+    """Add a newly created product to the search index"""
+    search_index.add(product_id, name, description, sku)
+    search_index.update_gauges()
     logger.info("Search index updated", product_id=product_id)
 
+async def index_products_by_sku(skus: List[str], chunk_size: int = 1000):
+    """Add bulk-inserted products to the search index"""
+    async with AsyncSessionLocal() as session:
+        for start in range(0, len(skus), chunk_size):
+            result = await session.execute(
+                select(*SEARCH_COLUMNS).where(Product.sku.in_(skus[start:start + chunk_size]))
+            )
+            search_index.add_many(result.all())
+    logger.info("Search index updated", products=len(skus))
+
 # Add a CPU-intensive endpoint for load testing
 @app.get("/compute/fibonacci/{n}")
-async def compute_fibonacci(n: int):
-    """CPU-intensive endpoint for performance testing"""
-    if n > 40:
-        raise HTTPException(status_code=400, detail="Number too large")
-    
-    def fib(x):
-        if x <= 1:
-            return x
-        return fib(x-1) + fib(x-2)
+async def compute_fibonacci(
+    n: int,
+    mode: str = Query("iterative", pattern="^(iterative|naive)$")
+):
+    """CPU-intensive endpoint for performance testing (mode=naive for the exponential stress variant)"""
+    if n < 0:
+        raise HTTPException(status_code=400, detail="Number must be non-negative")
     
     start_time = time.time()
-    result = fib(n)
+    if mode == "naive":
+        if n > 40:
+            raise HTTPException(status_code=400, detail="Number too large")
+        result = await cpu_executor.run("fibonacci_naive", fib_naive, n)
+    else:
+        if n > 1000:
+            raise HTTPException(status_code=400, detail="Number too large")
+        result = fib_iterative(n)
     duration = time.time() - start_time
     
     return {
         "input": n,
+        "mode": mode,
         "result": result,
         "computation_time_ms": round(duration * 1000, 2),
         "container_id": os.environ.get('HOSTNAME', 'unknown')
     }
 
+startup_timer.record("import", time.perf_counter() - _import_started)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8080)
\ No newline at end of file
@@ -0,0 +1,37 @@
+"""Add the (price, id) index used by sort=price keyset pagination
+
+create_all only creates missing tables, so databases that predate the
+index never got it and filesort every sort=price page.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEX = "ix_products_price_id"
+
+
+def _has_index() -> bool:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("products"):
+        return False
+    return any(index["name"] == INDEX for index in inspector.get_indexes("products"))
+
+
+def upgrade() -> None:
+    # Fresh databases built by create_all already have it
+    if not _has_index():
+        op.create_index(INDEX, "products", ["price", "id"])
+
+
+def downgrade() -> None:
+    if _has_index():
+        op.drop_index(INDEX, table_name="products")
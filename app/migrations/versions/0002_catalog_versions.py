@@ -0,0 +1,31 @@
+"""Add catalog_versions, the write counters behind list ETags and cache keys
+
+Rows are created by the first write to each catalog, so an empty table is
+a valid starting point.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # create_all may already have built it on this database
+    if not sa.inspect(op.get_bind()).has_table("catalog_versions"):
+        op.create_table(
+            "catalog_versions",
+            sa.Column("name", sa.String(50), primary_key=True),
+            sa.Column("version", sa.BigInteger, nullable=False, server_default="0"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("catalog_versions")
@@ -0,0 +1,105 @@
+"""
+Pre-rendered HTML Pages
+HTML rendered once and kept as encoded bytes with compressed variants,
+served with ETag / Cache-Control so repeat views cost a dictionary lookup
+"""
+
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse, Response
+from prometheus_client import Counter
+
+from compression import available_encodings, compress, negotiate
+from etag import etag_matches, make_etag
+
+# Prometheus metrics
+PAGE_RENDERS = Counter('page_renders_total', 'Times a cached HTML page was (re)rendered', ['page'])
+
+ENCODINGS = available_encodings()
+
+# Stands in for the volatile field while a template is rendered, then split on
+VOLATILE_MARKER = "\x00volatile\x00"
+
+
+class RenderedPage:
+    """Encoded body plus lazily built, memoized compressed variants"""
+
+    def __init__(self, body: bytes, best_compression: bool = True):
+        self.body = body
+        self.etag = make_etag(body)
+        self.best_compression = best_compression
+        self._variants: Dict[str, bytes] = {"identity": body}
+
+    def variant(self, encoding: str) -> bytes:
+        data = self._variants.get(encoding)
+        if data is None:
+            # Static pages are compressed once, so they get the slow, small settings
+            data = self._variants[encoding] = compress(self.body, encoding, best=self.best_compression)
+        return data
+
+    def response(self, request: Request, max_age: int, encodings: Sequence[str] = ENCODINGS) -> Response:
+        encoding = negotiate(request.headers.get("accept-encoding", ""), encodings)
+        # Strong ETags must differ per content-coding
+        etag = self.etag if encoding == "identity" else f'{self.etag[:-1]}-{encoding}"'
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}", "Vary": "Accept-Encoding"}
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return HTMLResponse(content=self.variant(encoding), headers=headers)
+
+
+class TemplatePage:
+    """A Jinja template rendered once, with one volatile field patched in per second.
+
+    The template is rendered with ``VOLATILE_MARKER`` in place of the
+    volatile value and split around it. Each new second joins the two halves
+    with a fresh timestamp, and that second's compressed variants are built
+    on demand. The template is re-rendered when Jinja reports the source
+    changed.
+    """
+
+    def __init__(self, name: str, environment_factory: Callable[[], Any], context: Dict[str, Any], volatile: str = "timestamp"):
+        self.name = name
+        self.environment_factory = environment_factory
+        self.context = context
+        self.volatile = volatile
+        self._template = None
+        self._halves = (b"", b"")
+        self._second: Optional[int] = None
+        self._page: Optional[RenderedPage] = None
+
+    def _render(self, template) -> None:
+        html = template.render(**self.context, **{self.volatile: VOLATILE_MARKER})
+        prefix, _, suffix = html.partition(VOLATILE_MARKER)
+        self._halves = (prefix.encode(), suffix.encode())
+        self._template = template
+        PAGE_RENDERS.labels(page=self.name).inc()
+
+    def current(self) -> RenderedPage:
+        second = int(time.time())
+        if second != self._second:
+            # get_template is a cache hit unless the file changed on disk
+            template = self.environment_factory().get_template(self.name)
+            if template is not self._template:
+                self._render(template)
+            stamp = datetime.utcfromtimestamp(second).isoformat().encode()
+            self._page = RenderedPage(self._halves[0] + stamp + self._halves[1], best_compression=False)
+            self._second = second
+        return self._page
+
+
+def warm_bytecode_cache(template_dir: str, cache_dir: str) -> int:
+    """Compile every template into ``cache_dir`` (run at image build time)"""
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+    os.makedirs(cache_dir, exist_ok=True)
+    environment = Environment(loader=FileSystemLoader(template_dir), bytecode_cache=FileSystemBytecodeCache(cache_dir))
+    names = environment.list_templates()
+    for name in names:
+        environment.get_template(name)
+    return len(names)
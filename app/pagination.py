@@ -0,0 +1,77 @@
+"""
+Keyset (Cursor) Pagination
+Opaque cursors that seek on an indexed key instead of scanning skipped rows
+"""
+
+import base64
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """Encode the last row's sort key as an opaque, URL-safe cursor"""
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor produced by encode_cursor, rejecting tampered values"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(position, dict) or not isinstance(position.get("id"), int):
+            raise ValueError("cursor has no id")
+        return position
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
+def apply_keyset(query, model, cursor: Optional[str], skip: int = 0, sort: str = "id"):
+    """Order a select by (sort column, id) and seek past the cursor.
+
+    Without a cursor the legacy ``skip`` offset is still honoured so existing
+    callers keep working; with a cursor the offset is ignored and the query
+    seeks on the index instead.
+    """
+    if sort == "id":
+        query = query.order_by(model.id)
+    else:
+        column = getattr(model, sort)
+        query = query.order_by(column, model.id)
+
+    if cursor is None:
+        return query.offset(skip) if skip else query
+
+    position = decode_cursor(cursor)
+    if sort == "id":
+        return query.where(model.id > position["id"])
+
+    value = position.get(sort)
+    if value is None:
+        raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+    column = getattr(model, sort)
+    return query.where(or_(column > value, and_(column == value, model.id > position["id"])))
+
+
+def set_next_cursor(response: Response, rows, limit: int, sort: str = "id") -> Optional[str]:
+    """Attach the cursor for the following page when this page is full.
+
+    Rows may be ORM objects or serialized dicts (e.g. from the catalog cache).
+    """
+    if limit <= 0 or len(rows) < limit:
+        return None
+
+    last = rows[-1]
+    get = last.get if isinstance(last, dict) else lambda name: getattr(last, name)
+    position = {"id": get("id")}
+    if sort != "id":
+        position[sort] = get(sort)
+
+    next_cursor = encode_cursor(position)
+    response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return next_cursor
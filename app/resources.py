@@ -0,0 +1,32 @@
+"""
+Container Resources
+CPU limits as seen from inside the container; free of metric and app imports
+so the gunicorn master can size its workers before anything forks
+"""
+
+import os
+
+
+def container_cpu_count() -> int:
+    """CPUs available to this container, honouring cgroup quotas and affinity"""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+    # cgroup v2 exposes "<quota> <period>", v1 splits them across two files
+    quota = period = None
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            raw_quota, raw_period = f.read().split()
+            if raw_quota != "max":
+                quota, period = int(raw_quota), int(raw_period)
+    except (OSError, ValueError):
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                quota = int(f.read())
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                period = int(f.read())
+        except (OSError, ValueError):
+            pass
+
+    if quota and period and quota > 0:
+        cpus = min(cpus, max(1, quota // period))
+    return max(1, cpus)
@@ -0,0 +1,234 @@
+"""
+Read-Replica Routing
+Sends reads to replica pools and writes to the primary, with health-based
+ejection and read-your-writes stickiness after a client's write
+"""
+
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import structlog
+from fastapi import Request
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from dbmetrics import ACQUIRE_WAIT_KEY, StatementTimer
+
+logger = structlog.get_logger()
+
+# Prometheus metrics
+DB_POOL_CHECKED_OUT = Gauge('db_pool_checked_out', 'Connections currently checked out', ['pool'])
+DB_POOL_OVERFLOW = Gauge('db_pool_overflow', 'Connections open beyond pool_size (negative: unopened pool slots)', ['pool'])
+DB_POOL_ACQUIRE_WAIT = Histogram(
+    'db_pool_acquire_wait_seconds',
+    'Time a checkout waited for a pooled or newly opened connection',
+    ['pool'],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+)
+DB_POOL_CONNECTIONS = Counter('db_pool_connections_total', 'New DBAPI connections opened', ['pool'])
+DB_ROUTED_SESSIONS = Counter('db_routed_sessions_total', 'Sessions opened by the read/write router', ['pool', 'reason'])
+DB_REPLICA_HEALTHY = Gauge('db_replica_healthy', 'Whether a replica is in rotation (1) or ejected (0)', ['pool'])
+DB_REPLICA_EJECTIONS = Counter('db_replica_ejections_total', 'Times a replica was taken out of rotation', ['pool'])
+
+# Cookie holding the unix time until which a client's reads go to the primary
+STICKY_COOKIE = "db_primary_until"
+READ_METHODS = ("GET", "HEAD")
+
+
+class Pool:
+    """One engine plus its session maker, checkout/overflow gauges and statement timing"""
+
+    def __init__(self, name: str, engine: AsyncEngine, slow_query_seconds: float = 0.5):
+        self.name = name
+        self.engine = engine
+        self.sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        self.statements = StatementTimer(name, engine, slow_query_seconds)
+        self.checked_out = 0
+        self.healthy = True
+
+        pool_events = engine.sync_engine.pool
+        event.listen(pool_events, "checkout", self._on_checkout)
+        event.listen(pool_events, "checkin", self._on_checkin)
+        event.listen(pool_events, "connect", self._on_connect)
+
+    def overflow(self) -> int:
+        # Only QueuePool-style pools track overflow
+        overflow = getattr(self.engine.sync_engine.pool, "overflow", None)
+        return overflow() if overflow is not None else 0
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        self.checked_out += 1
+        DB_POOL_CHECKED_OUT.labels(pool=self.name).set(self.checked_out)
+        DB_POOL_OVERFLOW.labels(pool=self.name).set(self.overflow())
+        wait = connection_record.info.pop(ACQUIRE_WAIT_KEY, None)
+        if wait is not None:
+            DB_POOL_ACQUIRE_WAIT.labels(pool=self.name).observe(wait)
+
+    def _on_checkin(self, *args) -> None:
+        self.checked_out = max(0, self.checked_out - 1)
+        DB_POOL_CHECKED_OUT.labels(pool=self.name).set(self.checked_out)
+        DB_POOL_OVERFLOW.labels(pool=self.name).set(self.overflow())
+
+    def _on_connect(self, *args) -> None:
+        DB_POOL_CONNECTIONS.labels(pool=self.name).inc()
+
+
+class DatabaseRouter:
+    """Chooses a pool per request.
+
+    Writes, and reads from a client that wrote within ``sticky_seconds``,
+    use the primary. Other reads are balanced across healthy replicas,
+    either ``round_robin`` or ``least_connections`` (fewest checked-out
+    connections). A replica is ejected when a session on it hits a
+    connection-level error or fails the background ``SELECT 1`` check, and
+    returns once a check succeeds. With no healthy replica, reads fall back
+    to the primary.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: Optional[List[AsyncEngine]] = None,
+        balancing: str = "round_robin",
+        sticky_seconds: float = 5.0,
+        check_interval_seconds: float = 5.0,
+        slow_query_seconds: float = 0.5
+    ):
+        self.primary = Pool("primary", primary, slow_query_seconds)
+        self.replicas = [Pool(f"replica-{i}", engine, slow_query_seconds) for i, engine in enumerate(replicas or [])]
+        self.balancing = balancing
+        self.sticky_seconds = sticky_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self._rotation = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        for replica in self.replicas:
+            DB_REPLICA_HEALTHY.labels(pool=replica.name).set(1)
+
+    @property
+    def pools(self) -> List[Pool]:
+        return [self.primary, *self.replicas]
+
+    # Pool selection
+    def _pick_replica(self) -> Optional[Pool]:
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        offset = next(self._rotation) % len(healthy)
+        if self.balancing == "least_connections":
+            # Rotating the start breaks ties evenly between idle replicas
+            rotated = healthy[offset:] + healthy[:offset]
+            return min(rotated, key=lambda replica: replica.checked_out)
+        return healthy[offset]
+
+    def is_sticky(self, request: Request) -> bool:
+        try:
+            return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def route(self, request: Optional[Request]) -> Tuple[Pool, str]:
+        if request is None or request.method not in READ_METHODS:
+            return self.primary, "write"
+        if not self.replicas:
+            return self.primary, "read"
+        if self.is_sticky(request):
+            return self.primary, "sticky"
+        replica = self._pick_replica()
+        if replica is None:
+            return self.primary, "fallback"
+        return replica, "read"
+
+    def mark_write(self, response) -> None:
+        """Pin the client's reads to the primary for ``sticky_seconds``"""
+        if self.replicas and self.sticky_seconds > 0:
+            until = time.time() + self.sticky_seconds
+            response.set_cookie(
+                STICKY_COOKIE, f"{until:.3f}", max_age=max(1, int(self.sticky_seconds) + 1), httponly=True, samesite="lax"
+            )
+
+    @asynccontextmanager
+    async def session(self, request: Optional[Request] = None) -> AsyncIterator[AsyncSession]:
+        pool, reason = self.route(request)
+        DB_ROUTED_SESSIONS.labels(pool=pool.name, reason=reason).inc()
+        if request is not None:
+            # Handlers check this to keep sticky and fallback reads out of shared caches
+            request.state.db_route = (pool, reason)
+        async with pool.sessions() as session:
+            try:
+                yield session
+            except DBAPIError as e:
+                if pool is not self.primary and e.connection_invalidated:
+                    self._eject(pool, str(e))
+                raise
+
+    def reader_session(self) -> AsyncSession:
+        """Session for background reads (exports, index builds) outside a request"""
+        replica = self._pick_replica() if self.replicas else None
+        pool = replica or self.primary
+        DB_ROUTED_SESSIONS.labels(pool=pool.name, reason="background").inc()
+        return pool.sessions()
+
+    # Health checks
+    def _eject(self, replica: Pool, reason: str) -> None:
+        if replica.healthy:
+            replica.healthy = False
+            DB_REPLICA_HEALTHY.labels(pool=replica.name).set(0)
+            DB_REPLICA_EJECTIONS.labels(pool=replica.name).inc()
+            logger.warning("Replica ejected", pool=replica.name, reason=reason)
+
+    def _restore(self, replica: Pool) -> None:
+        if not replica.healthy:
+            replica.healthy = True
+            DB_REPLICA_HEALTHY.labels(pool=replica.name).set(1)
+            logger.info("Replica restored", pool=replica.name)
+
+    async def _check(self, replica: Pool) -> None:
+        try:
+            async with replica.engine.connect() as conn:
+                await asyncio.wait_for(conn.execute(text("SELECT 1")), timeout=self.check_interval_seconds)
+        except Exception as e:
+            self._eject(replica, str(e))
+        else:
+            self._restore(replica)
+
+    async def check_replicas(self) -> None:
+        await asyncio.gather(*(self._check(replica) for replica in self.replicas))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval_seconds)
+            await self.check_replicas()
+
+    async def start(self) -> None:
+        if self.replicas and self._task is None:
+            await self.check_replicas()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def dispose(self) -> None:
+        for pool in self.pools:
+            await pool.engine.dispose()
+
+    def report(self) -> List[Dict[str, Any]]:
+        return [
+            {"pool": pool.name, "healthy": pool.healthy, "checked_out": pool.checked_out, "overflow": pool.overflow()}
+            for pool in self.pools
+        ]
+
+    def statement_report(self, top: int = 20) -> List[Dict[str, Any]]:
+        """Most expensive statements across all pools"""
+        rows = [row for pool in self.pools for row in pool.statements.report(top)]
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)[:top]
@@ -0,0 +1,195 @@
+"""
+Product Search Index
+In-process inverted index over product name, SKU and description with
+prefix matching and IDF-weighted ranking
+"""
+
+import heapq
+import math
+import re
+import sys
+from array import array
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from prometheus_client import Gauge
+
+# Prometheus metrics
+SEARCH_INDEX_DOCUMENTS = Gauge('search_index_documents', 'Products in the search index')
+SEARCH_INDEX_TERMS = Gauge('search_index_terms', 'Distinct terms in the search index')
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Field bits stored per posting; a term found in several fields scores their sum
+FIELD_NAME, FIELD_SKU, FIELD_DESCRIPTION = 1, 2, 4
+FIELD_WEIGHTS = {FIELD_NAME: 3.0, FIELD_SKU: 5.0, FIELD_DESCRIPTION: 1.0}
+_MASK_WEIGHTS = [
+    sum(weight for bit, weight in FIELD_WEIGHTS.items() if mask & bit)
+    for mask in range(8)
+]
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_EXPANSIONS = 50
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase alphanumeric tokens; interned so each term string is stored once"""
+    if not text:
+        return []
+    return [sys.intern(token) for token in _TOKEN_RE.findall(text.lower())]
+
+
+class SearchIndex:
+    """Inverted index with array-backed posting lists.
+
+    Each term maps to an ``array('I')`` of product ids plus a parallel
+    ``array('B')`` of field bitmasks, i.e. five bytes per posting. Ids are
+    appended in increasing order when products are created, so lists stay
+    sorted without rebuilding; out-of-order adds fall back to an insert.
+    A sorted vocabulary supports prefix expansion of the last query term.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, array] = {}
+        self._fields: Dict[str, array] = {}
+        self._vocabulary: List[str] = []
+        self._indexed = bytearray()  # bitmap of product ids already indexed
+        self.documents = 0
+        self.last_indexed = 0  # highest product id seen, where periodic refreshes resume
+        self.ready = False
+
+    def __contains__(self, product_id: int) -> bool:
+        byte = product_id >> 3
+        return byte < len(self._indexed) and bool(self._indexed[byte] & (1 << (product_id & 7)))
+
+    def add(self, product_id: int, name: Optional[str], description: Optional[str], sku: Optional[str]) -> None:
+        for token in self._add(product_id, name, description, sku):
+            insort(self._vocabulary, token)
+
+    def _add(self, product_id: int, name: Optional[str], description: Optional[str], sku: Optional[str]) -> List[str]:
+        """Index one product, returning terms not seen before"""
+        new_terms: List[str] = []
+        if product_id in self:
+            return new_terms
+
+        masks: Dict[str, int] = {}
+        for field, text in ((FIELD_NAME, name), (FIELD_SKU, sku), (FIELD_DESCRIPTION, description)):
+            for token in tokenize(text):
+                masks[token] = masks.get(token, 0) | field
+
+        for token, mask in masks.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                self._postings[token] = array('I', (product_id,))
+                self._fields[token] = array('B', (mask,))
+                new_terms.append(token)
+                continue
+
+            fields = self._fields[token]
+            if postings[-1] < product_id:
+                postings.append(product_id)
+                fields.append(mask)
+            else:
+                position = bisect_left(postings, product_id)
+                postings.insert(position, product_id)
+                fields.insert(position, mask)
+
+        byte = product_id >> 3
+        if byte >= len(self._indexed):
+            self._indexed.extend(bytes(byte - len(self._indexed) + 1))
+        self._indexed[byte] |= 1 << (product_id & 7)
+        self.documents += 1
+        if product_id > self.last_indexed:
+            self.last_indexed = product_id
+        return new_terms
+
+    def add_many(self, rows: Iterable[Tuple[int, Optional[str], Optional[str], Optional[str]]]) -> None:
+        """Index a batch, re-sorting the vocabulary once instead of per new term"""
+        new_terms = False
+        for product_id, name, description, sku in rows:
+            new_terms = bool(self._add(product_id, name, description, sku)) or new_terms
+        if new_terms:
+            self._vocabulary = sorted(self._postings)
+        self.update_gauges()
+
+    def update_gauges(self) -> None:
+        SEARCH_INDEX_DOCUMENTS.set(self.documents)
+        SEARCH_INDEX_TERMS.set(len(self._vocabulary))
+
+    def _expand(self, token: str, prefix: bool) -> List[str]:
+        if not prefix or len(token) < MIN_PREFIX_LENGTH:
+            return [token] if token in self._postings else []
+
+        terms = []
+        position = bisect_left(self._vocabulary, token)
+        # Cap expansions (like a search engine's max_expansions) so short prefixes stay cheap
+        while (
+            position < len(self._vocabulary)
+            and len(terms) < MAX_PREFIX_EXPANSIONS
+            and self._vocabulary[position].startswith(token)
+        ):
+            terms.append(self._vocabulary[position])
+            position += 1
+        return terms
+
+    def _term_weights(self, token: str, terms: List[str]) -> List[Tuple[str, float]]:
+        total = max(self.documents, 1)
+        weights = []
+        for term in terms:
+            idf = math.log(1 + total / len(self._postings[term]))
+            # Exact matches outrank prefix completions of the same query term
+            weights.append((term, idf if term == token else idf * 0.5))
+        return weights
+
+    def _collect(self, weights: List[Tuple[str, float]]) -> Dict[int, float]:
+        """Materialize scores for every product matching one query term"""
+        scores: Dict[int, float] = {}
+        for term, boost in weights:
+            for product_id, mask in zip(self._postings[term], self._fields[term]):
+                score = boost * _MASK_WEIGHTS[mask]
+                if score > scores.get(product_id, 0.0):
+                    scores[product_id] = score
+        return scores
+
+    def _probe(self, product_id: int, weights: List[Tuple[str, float]]) -> float:
+        """Score one candidate for a query term by binary search in its posting lists"""
+        best = 0.0
+        for term, boost in weights:
+            postings = self._postings[term]
+            position = bisect_left(postings, product_id)
+            if position < len(postings) and postings[position] == product_id:
+                best = max(best, boost * _MASK_WEIGHTS[self._fields[term][position]])
+        return best
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[int, float]]:
+        """Return (product_id, score) for products matching every query term.
+
+        The last term is matched as a prefix so partially typed words work.
+        Only the rarest term's postings are scanned; the other terms are
+        checked per candidate with a binary search, so common words such as
+        "sku" cost O(candidates * log n) rather than a full scan.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        per_token = []
+        for i, token in enumerate(tokens):
+            terms = self._expand(token, prefix=(i == len(tokens) - 1))
+            if not terms:
+                return []
+            size = sum(len(self._postings[term]) for term in terms)
+            per_token.append((size, self._term_weights(token, terms)))
+        per_token.sort(key=lambda item: item[0])
+
+        candidates = self._collect(per_token[0][1])
+        for _, weights in per_token[1:]:
+            narrowed = {}
+            for product_id, score in candidates.items():
+                extra = self._probe(product_id, weights)
+                if extra:
+                    narrowed[product_id] = score + extra
+            candidates = narrowed
+            if not candidates:
+                return []
+
+        return heapq.nsmallest(limit, candidates.items(), key=lambda item: (-item[1], item[0]))
@@ -0,0 +1,53 @@
+"""
+Request Coalescing (Single-Flight)
+Concurrent identical reads await one in-flight call and share its result
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from prometheus_client import Counter, Gauge
+
+# Prometheus metrics
+SINGLEFLIGHT_CALLS = Counter('singleflight_calls_total', 'Calls executed on behalf of a coalesced group', ['group'])
+SINGLEFLIGHT_COALESCED = Counter(
+    'singleflight_coalesced_total',
+    'Requests that awaited an identical in-flight call (one DB call saved each)', ['group']
+)
+SINGLEFLIGHT_IN_FLIGHT = Gauge('singleflight_in_flight', 'Distinct keys with a call in flight', ['group'])
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls by key.
+
+    The first caller for a key (the leader) runs the call; callers arriving
+    while it is in flight await the same task. Results are shared, so they
+    must be treated as read-only. If the leader is cancelled (client went
+    away) its waiters retry rather than failing with the leader.
+    """
+
+    def __init__(self, group: str):
+        self.group = group
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is not None and not task.done():
+            SINGLEFLIGHT_COALESCED.labels(group=self.group).inc()
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if task.cancelled():
+                    return await self.do(key, fn)
+                raise
+
+        task = asyncio.ensure_future(fn())
+        self._calls[key] = task
+        SINGLEFLIGHT_CALLS.labels(group=self.group).inc()
+        SINGLEFLIGHT_IN_FLIGHT.labels(group=self.group).set(len(self._calls))
+        try:
+            return await task
+        finally:
+            if self._calls.get(key) is task:
+                del self._calls[key]
+            SINGLEFLIGHT_IN_FLIGHT.labels(group=self.group).set(len(self._calls))
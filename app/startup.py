@@ -0,0 +1,45 @@
+"""
+Startup Timing
+Records how long each cold-start phase took (import, config, DB connect,
+services, first request) for logs and metrics
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+import structlog
+from prometheus_client import Gauge
+
+logger = structlog.get_logger()
+
+# Prometheus metrics
+STARTUP_PHASE_SECONDS = Gauge('app_startup_phase_seconds', 'Duration of each startup phase', ['phase'])
+
+
+class StartupTimer:
+    """Collects phase durations; ``first_request`` is recorded once by the middleware"""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.first_request_done = False
+
+    def record(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = seconds
+        STARTUP_PHASE_SECONDS.labels(phase=phase).set(seconds)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start_time)
+
+    def report(self) -> Dict[str, float]:
+        return {f"{phase}_ms": round(seconds * 1000, 2) for phase, seconds in self.phases.items()}
+
+    def first_request(self, seconds: float) -> None:
+        self.first_request_done = True
+        self.record("first_request", seconds)
+        logger.info("First request served", **self.report())
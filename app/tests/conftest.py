@@ -0,0 +1,9 @@
+"""
+Test Configuration
+The app modules are flat files in app/, imported the same way main.py does
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,201 @@
+"""
+Catalog Cache Tests
+MemoryCache eviction, RedisCache against a local fake client, and
+ReadThroughCache invalidation
+"""
+
+import asyncio
+import fnmatch
+
+import pytest
+
+from cache import INVALIDATED_AT_KEY, MemoryCache, ReadThroughCache, RedisCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    """The subset of the redis.asyncio client RedisCache uses, held in a dict"""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+        self.closed = False
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        self.expiry[key] = ex
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def scan_iter(self, match="*"):
+        for key in list(self.data):
+            if fnmatch.fnmatchcase(key, match):
+                yield key
+
+    async def aclose(self):
+        self.closed = True
+
+
+async def test_memory_cache_expires_entries():
+    clock = FakeClock()
+    backend = MemoryCache(max_entries=10, ttl_seconds=30, clock=clock)
+    await backend.set("products", 1, {"id": 1})
+
+    clock.now += 29
+    assert await backend.get("products", 1) == {"id": 1}
+    clock.now += 2
+    assert await backend.get("products", 1) is None
+    assert len(backend) == 0
+
+
+async def test_memory_cache_evicts_least_recently_used():
+    backend = MemoryCache(max_entries=2, ttl_seconds=30)
+    await backend.set("products", 1, "a")
+    await backend.set("products", 2, "b")
+    await backend.get("products", 1)
+    await backend.set("products", 3, "c")
+
+    assert await backend.get("products", 1) == "a"
+    assert await backend.get("products", 2) is None
+    assert await backend.get("products", 3) == "c"
+
+
+async def test_memory_cache_invalidates_one_namespace():
+    backend = MemoryCache()
+    await backend.set("products", 1, "a")
+    await backend.set("categories", 1, "b")
+    await backend.invalidate("products")
+
+    assert await backend.get("products", 1) is None
+    assert await backend.get("categories", 1) == "b"
+
+
+async def test_redis_cache_round_trips_json_with_ttl():
+    client = FakeRedis()
+    backend = RedisCache(client, ttl_seconds=30)
+    await backend.set("products", (3, None, 10.0, 0, 20), [{"id": 1, "price": 9.5}])
+
+    assert list(client.data) == ["catalog:products:3||10.0|0|20"]
+    assert client.expiry["catalog:products:3||10.0|0|20"] == 30
+    assert await backend.get("products", (3, None, 10.0, 0, 20)) == [{"id": 1, "price": 9.5}]
+
+
+async def test_redis_cache_invalidate_only_touches_its_namespace():
+    client = FakeRedis()
+    backend = RedisCache(client)
+    await backend.set("products", 1, "a")
+    await backend.set("products", 2, "b")
+    await backend.set("product", 1, "c")
+    await backend.invalidate("products")
+
+    assert await backend.get("products", 1) is None
+    assert await backend.get("products", 2) is None
+    assert await backend.get("product", 1) == "c"
+
+    await backend.close()
+    assert client.closed
+
+
+async def test_read_through_loads_once_then_hits():
+    cache = ReadThroughCache(MemoryCache())
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return ["row"]
+
+    assert await cache.get_or_load("products", "page", loader) == ["row"]
+    assert await cache.get_or_load("products", "page", loader) == ["row"]
+    assert len(calls) == 1
+
+
+async def test_read_through_does_not_store_none():
+    cache = ReadThroughCache(MemoryCache())
+
+    async def missing():
+        return None
+
+    assert await cache.get_or_load("product", 404, missing) is None
+    assert await cache.backend.get("product", 404) is None
+
+
+@pytest.mark.parametrize("backend_factory", [MemoryCache, lambda: RedisCache(FakeRedis())])
+async def test_invalidate_drops_cached_values(backend_factory):
+    cache = ReadThroughCache(backend_factory())
+    version = {"value": 1}
+
+    async def loader():
+        return version["value"]
+
+    assert await cache.get_or_load("products", "page", loader) == 1
+    version["value"] = 2
+    await cache.invalidate("products")
+    assert await cache.get_or_load("products", "page", loader) == 2
+
+
+async def test_load_racing_an_invalidation_is_not_stored():
+    cache = ReadThroughCache(MemoryCache())
+    loading = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_loader():
+        loading.set()
+        await release.wait()
+        return "stale"
+
+    load = asyncio.create_task(cache.get_or_load("products", "page", slow_loader))
+    await loading.wait()
+    await cache.invalidate("products")
+    release.set()
+
+    # The caller still gets its rows, but they were read before the write
+    assert await load == "stale"
+    assert await cache.backend.get("products", "page") is None
+
+
+async def test_delete_bumps_generation_for_in_flight_loads():
+    cache = ReadThroughCache(MemoryCache())
+    loading = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_loader():
+        loading.set()
+        await release.wait()
+        return {"id": 7, "stock_quantity": 25}
+
+    load = asyncio.create_task(cache.get_or_load("product", 7, slow_loader))
+    await loading.wait()
+    await cache.delete("product", 7)
+    release.set()
+
+    await load
+    assert await cache.backend.get("product", 7) is None
+
+
+async def test_replica_loads_skip_the_cache_after_an_invalidation():
+    cache = ReadThroughCache(MemoryCache(), replica_quiet_seconds=60)
+
+    async def loader():
+        return "from replica"
+
+    await cache.invalidate("products")
+    assert await cache.backend.get("products", INVALIDATED_AT_KEY) is not None
+
+    assert await cache.get_or_load("products", "page", loader, from_replica=True) == "from replica"
+    assert await cache.backend.get("products", "page") is None
+
+    # Primary reads are never behind, so they may refill the namespace
+    await cache.get_or_load("products", "page", loader)
+    assert await cache.backend.get("products", "page") == "from replica"
@@ -0,0 +1,121 @@
+"""
+Group Commit Tests
+A bad unit fails alone; batch-level database errors retry units one by one
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import declarative_base
+
+from group_commit import GroupCommitter
+
+Base = declarative_base()
+
+
+class Account(Base):
+    __tablename__ = "accounts"
+
+    id = Column(Integer, primary_key=True)
+    email = Column(String(100), unique=True, nullable=False)
+
+
+@pytest.fixture
+async def sessions(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'accounts.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def committer(sessions):
+    locked = []
+
+    async def lock_rows(session, keys):
+        locked.append(keys)
+
+    committer = GroupCommitter("test", sessions, lock_rows, max_batch=10, max_wait_seconds=0.05)
+    committer.locked = locked
+    yield committer
+    await committer.stop()
+
+
+def create(email: str):
+    async def work(session):
+        account = Account(email=email)
+        session.add(account)
+        await session.flush()
+        return account.id
+    return work
+
+
+async def stored_emails(sessions):
+    async with sessions() as session:
+        return sorted((await session.execute(select(Account.email))).scalars().all())
+
+
+async def test_units_share_one_batch_and_lock_in_key_order(committer, sessions):
+    results = await asyncio.gather(
+        committer.submit(create("a@example.com"), [3, 1]),
+        committer.submit(create("b@example.com"), [2, 1]),
+    )
+
+    assert len(set(results)) == 2
+    assert committer.locked == [[1, 2, 3]]
+    assert await stored_emails(sessions) == ["a@example.com", "b@example.com"]
+
+
+async def test_constraint_violation_only_fails_its_own_unit(committer, sessions):
+    await committer.submit(create("taken@example.com"), [])
+
+    results = await asyncio.gather(
+        committer.submit(create("first@example.com"), []),
+        committer.submit(create("taken@example.com"), []),
+        committer.submit(create("last@example.com"), []),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[1], IntegrityError)
+    assert isinstance(results[0], int) and isinstance(results[2], int)
+    assert await stored_emails(sessions) == ["first@example.com", "last@example.com", "taken@example.com"]
+
+
+async def test_application_error_only_fails_its_own_unit(committer, sessions):
+    async def reject(session):
+        session.add(Account(email="rejected@example.com"))
+        await session.flush()
+        raise ValueError("insufficient stock")
+
+    results = await asyncio.gather(
+        committer.submit(reject, []),
+        committer.submit(create("kept@example.com"), []),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[0], ValueError)
+    assert await stored_emails(sessions) == ["kept@example.com"]
+
+
+async def test_batch_error_retries_each_unit_in_its_own_transaction(committer, sessions):
+    attempts = []
+
+    async def deadlocks_once(session):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OperationalError("UPDATE accounts", {}, Exception("Deadlock found"))
+        return await create("retried@example.com")(session)
+
+    results = await asyncio.gather(
+        committer.submit(create("batched@example.com"), []),
+        committer.submit(deadlocks_once, []),
+    )
+
+    assert len(attempts) == 2
+    assert all(isinstance(result, int) for result in results)
+    assert await stored_emails(sessions) == ["batched@example.com", "retried@example.com"]
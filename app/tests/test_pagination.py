@@ -0,0 +1,88 @@
+"""
+Keyset Pagination Tests
+Cursors walk every row exactly once, including across ties in the sort column
+"""
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import Column, Float, Integer
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import declarative_base
+
+from pagination import NEXT_CURSOR_HEADER, apply_keyset, decode_cursor, encode_cursor, set_next_cursor
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id = Column(Integer, primary_key=True)
+    price = Column(Float, nullable=False)
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'items.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        # Prices repeat so pages break in the middle of a tie
+        await conn.execute(Item.__table__.insert(), [{"id": i, "price": float(i % 4)} for i in range(1, 24)])
+    yield engine
+    await engine.dispose()
+
+
+async def walk(engine, sort: str, limit: int):
+    pages = []
+    cursor = None
+    async with engine.connect() as conn:
+        while True:
+            query = apply_keyset(select(Item.id, Item.price), Item, cursor, sort=sort).limit(limit)
+            rows = [dict(row) for row in (await conn.execute(query)).mappings().all()]
+            pages.append(rows)
+            response = Response()
+            cursor = set_next_cursor(response, rows, limit, sort)
+            if cursor is None:
+                assert NEXT_CURSOR_HEADER not in response.headers
+                return pages
+            assert response.headers[NEXT_CURSOR_HEADER] == cursor
+
+
+@pytest.mark.parametrize("sort", ["id", "price"])
+async def test_cursor_walk_returns_every_row_once_in_order(engine, sort):
+    pages = await walk(engine, sort, limit=5)
+    rows = [row for page in pages for row in page]
+
+    assert sorted(row["id"] for row in rows) == list(range(1, 24))
+    assert rows == sorted(rows, key=lambda row: (row[sort], row["id"]))
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+
+
+async def test_full_last_page_ends_with_an_empty_page(engine):
+    pages = await walk(engine, "id", limit=23)
+    assert [len(page) for page in pages] == [23, 0]
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor({"id": 42, "price": 9.99})
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == {"id": 42, "price": 9.99}
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor({"price": 1.0}), encode_cursor({"id": "42"})])
+def test_tampered_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor)
+    assert raised.value.status_code == 400
+
+
+def test_cursor_from_another_sort_order_is_a_400():
+    with pytest.raises(HTTPException) as raised:
+        apply_keyset(select(Item), Item, encode_cursor({"id": 3}), sort="price")
+    assert raised.value.status_code == 400
+
+
+def test_offset_is_only_used_without_a_cursor():
+    assert " OFFSET " in str(apply_keyset(select(Item), Item, None, skip=10))
+    assert " OFFSET " not in str(apply_keyset(select(Item), Item, encode_cursor({"id": 3}), skip=10))